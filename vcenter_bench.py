@@ -0,0 +1,751 @@
+#!/usr/bin/env python3
+"""
+Pengganti vCenter offline + benchmark untuk vcenter_export_fixed.py
+Inventori sintetis dibangun di memori dan dilayani lewat stub pyVmomi palsu,
+sehingga exporter bisa diuji dan diukur tanpa vCenter sungguhan.
+"""
+
+from pyVmomi import vim, vmodl, VmomiSupport
+from pyVmomi.StubAdapterAccessorImpl import StubAdapterAccessorMixin
+import argparse
+import itertools
+import json
+import os
+import random
+import resource
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta, timezone
+
+import vcenter_export_fixed as exporter
+
+# ============================================
+# STUB PYVMOMI PALSU
+# ============================================
+
+class FakeEntity:
+    """Satu managed object di inventori palsu"""
+    __slots__ = ('mo', 'props', 'children')
+
+    def __init__(self, mo, props):
+        self.mo = mo
+        self.props = props
+        self.children = []
+
+def _typed(value):
+    """Ubah list Python biasa menjadi array bertipe vmodl (seperti hasil SOAP)"""
+    if not isinstance(value, list) or hasattr(type(value), 'Item'):
+        return value
+    if not value:
+        return None
+    if isinstance(value[0], str):
+        return VmomiSupport.GetVmodlType('string[]')(value)
+    if isinstance(value[0], int):
+        return VmomiSupport.GetVmodlType('long[]')(value)
+    for cls in type(value[0]).__mro__:
+        if hasattr(cls, 'Array') and all(isinstance(v, cls) for v in value):
+            return cls.Array(value)
+    return value
+
+def _resolve(value, parts):
+    """Ikuti path properti bertitik (mis. summary.capacity)"""
+    for part in parts:
+        if value is None:
+            return None
+        value = getattr(value, part, None)
+    return value
+
+class FakeStub(StubAdapterAccessorMixin):
+    """Stub pyVmomi palsu: semua method SOAP dijawab dari inventori di memori
+
+    Setiap panggilan dihitung sebagai satu round trip (calls, calls_by_method).
+    """
+
+    def __init__(self, max_page=100):
+        self.version = VmomiSupport.newestVersions.GetName('vim')
+        self.entities = {}
+        self.views = {}
+        self.results = {}
+        self.calls = 0
+        self.calls_by_method = {}
+        self.max_page = max_page
+        self.lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.cookie = 'vmware_soap_session="fake"'
+        self.events = []
+        self.tasks = []
+        self.session_id = 'fake-session'
+
+    def add(self, cls, moid, parent=None, **props):
+        """Tambahkan managed object ke inventori"""
+        mo = cls(moid, self)
+        self.entities[moid] = FakeEntity(mo, props)
+        if parent is not None:
+            self.entities[parent._moId].children.append(mo)
+            props.setdefault('parent', parent)
+        return mo
+
+    def GetSessionId(self):
+        return self.session_id
+
+    def DropConnections(self):
+        pass
+
+    def reset_counters(self):
+        """Nol-kan penghitung round trip"""
+        with self.lock:
+            self.calls = 0
+            self.calls_by_method = {}
+
+    def _descendants(self, root, types, recursive):
+        seen = set()
+        found = []
+        stack = list(reversed(self.entities[root._moId].children))
+        while stack:
+            mo = stack.pop()
+            if mo._moId in seen or mo._moId not in self.entities:
+                continue
+            seen.add(mo._moId)
+            if isinstance(mo, tuple(types)):
+                found.append(mo)
+            if recursive:
+                stack.extend(reversed(self.entities[mo._moId].children))
+        return found
+
+    def _props_for(self, mo, paths, all_props):
+        entity = self.entities.get(mo._moId)
+        if entity is None:
+            return None
+        if all_props:
+            paths = list(entity.props)
+        prop_set = []
+        for path in paths:
+            parts = path.split('.')
+            if parts[0] not in entity.props:
+                continue
+            value = _typed(_resolve(entity.props[parts[0]], parts[1:]))
+            if value is None:
+                continue
+            prop_set.append(vmodl.DynamicProperty(name=path, val=value))
+        return prop_set
+
+    def _collect(self, spec_set):
+        PC = vmodl.query.PropertyCollector
+        contents = []
+        for spec in spec_set:
+            objs = []
+            for ospec in spec.objectSet:
+                if not ospec.skip:
+                    objs.append(ospec.obj)
+                for sel in ospec.selectSet or []:
+                    if sel.path == 'view' and ospec.obj._moId in self.views:
+                        objs.extend(self._view_objects(ospec.obj._moId))
+                    elif isinstance(ospec.obj, sel.type) and ospec.obj._moId in self.entities:
+                        # TraversalSpec biasa: ikuti property berisi moref
+                        value = self.entities[ospec.obj._moId].props.get(sel.path)
+                        objs.extend(value if isinstance(value, list) else [value] if value else [])
+            for obj in objs:
+                for pspec in spec.propSet:
+                    if not isinstance(obj, pspec.type):
+                        continue
+                    prop_set = self._props_for(obj, pspec.pathSet or [], pspec.all)
+                    if prop_set is None:
+                        contents.append(PC.ObjectContent(obj=obj, missingSet=[PC.MissingProperty(
+                            path='name', fault=vmodl.fault.ManagedObjectNotFound(obj=obj))]))
+                    else:
+                        contents.append(PC.ObjectContent(obj=obj, propSet=prop_set))
+        return contents
+
+    def _page(self, contents, max_objects):
+        size = min(max_objects or self.max_page, self.max_page)
+        page, rest = contents[:size], contents[size:]
+        token = None
+        if rest:
+            token = f'token-{next(self._ids)}'
+            self.results[token] = (rest, size)
+        if not page:
+            return None
+        return vmodl.query.PropertyCollector.RetrieveResult(token=token, objects=page)
+
+    def _view_objects(self, moid):
+        container, types, recursive = self.views[moid]
+        return self._descendants(container, types, recursive)
+
+    def _snapshot(self, spec):
+        return {oc.obj._moId: (oc.obj, {p.name: p.val for p in oc.propSet or []})
+                for oc in self._collect([spec])}
+
+    def InvokeMethod(self, mo, info, args):
+        """Titik masuk semua panggilan SOAP pyVmomi"""
+        name = info.wsdlName
+        with self.lock:
+            self.calls += 1
+            self.calls_by_method[name] = self.calls_by_method.get(name, 0) + 1
+        handler = getattr(self, '_m_' + name, None)
+        if handler is None:
+            raise vmodl.fault.NotSupported(msg=f'fake stub: {name}')
+        return handler(mo, *args)
+
+    # -- method vSphere API yang didukung --
+    def _m_Fetch(self, mo, prop):
+        entity = self.entities.get(mo._moId)
+        if entity is None:
+            raise vmodl.fault.ManagedObjectNotFound(obj=mo)
+        return _typed(entity.props.get(prop))
+
+    def _m_RetrieveServiceContent(self, mo):
+        return self.entities['ServiceInstance'].props['content']
+
+    def _m_CurrentTime(self, mo):
+        return datetime.now(timezone.utc)
+
+    def _m_CreateContainerView(self, mo, container, types, recursive):
+        moid = f'session[fake]{next(self._ids)}'
+        self.views[moid] = (container, types or [vim.ManagedEntity], recursive)
+        view = vim.view.ContainerView(moid, self)
+        self.entities[moid] = FakeEntity(view, {})
+        return view
+
+    def _m_DestroyView(self, mo):
+        self.views.pop(mo._moId, None)
+        self.entities.pop(mo._moId, None)
+
+    def _m_RetrievePropertiesEx(self, mo, spec_set, options):
+        return self._page(self._collect(spec_set), options.maxObjects if options else None)
+
+    def _m_ContinueRetrievePropertiesEx(self, mo, token):
+        contents, size = self.results.pop(token, ([], None))
+        return self._page(contents, size)
+
+    def _m_CancelRetrievePropertiesEx(self, mo, token):
+        self.results.pop(token, None)
+
+    def _m_RetrieveContents(self, mo, spec_set):
+        return self._collect(spec_set)
+
+    def _m_CreatePropertyCollector(self, mo):
+        moid = f'session[fake]pc{next(self._ids)}'
+        collector = vim.PropertyCollector(moid, self)
+        self.entities[moid] = FakeEntity(collector, {'filters': {}, 'version': 0, 'cancel': False})
+        return collector
+
+    def _m_DestroyPropertyCollector(self, mo):
+        self.entities.pop(mo._moId, None)
+
+    def _m_CreateFilter(self, mo, spec, partialUpdates):
+        moid = f'session[fake]filter{next(self._ids)}'
+        self.entities[mo._moId].props['filters'][moid] = {'spec': spec, 'known': {}}
+        pfilter = vmodl.query.PropertyCollector.Filter(moid, self)
+        self.entities[moid] = FakeEntity(pfilter, {})
+        return pfilter
+
+    def _m_WaitForUpdatesEx(self, mo, version, options):
+        PC = vmodl.query.PropertyCollector
+        collector = self.entities[mo._moId].props
+        max_wait = 60
+        if options and options.maxWaitSeconds is not None:
+            max_wait = options.maxWaitSeconds
+        deadline = time.time() + max_wait
+        while True:
+            filter_sets = []
+            for fmoid, pfilter in collector['filters'].items():
+                current = self._snapshot(pfilter['spec'])
+                known = pfilter['known']
+                updates = []
+                for moid, (obj, props) in current.items():
+                    if moid not in known:
+                        updates.append(PC.ObjectUpdate(kind='enter', obj=obj, changeSet=[
+                            PC.Change(name=k, op='assign', val=v) for k, v in props.items()]))
+                    elif props != known[moid][1]:
+                        old = known[moid][1]
+                        changes = [PC.Change(name=k, op='assign', val=v)
+                                   for k, v in props.items() if old.get(k) != v]
+                        changes += [PC.Change(name=k, op='remove') for k in old if k not in props]
+                        updates.append(PC.ObjectUpdate(kind='modify', obj=obj, changeSet=changes))
+                for moid, (obj, _) in known.items():
+                    if moid not in current:
+                        updates.append(PC.ObjectUpdate(kind='leave', obj=obj))
+                pfilter['known'] = current
+                if updates:
+                    filter_sets.append(PC.FilterUpdate(filter=self.entities[fmoid].mo,
+                                                       objectSet=updates))
+            if filter_sets:
+                collector['version'] += 1
+                return PC.UpdateSet(version=str(collector['version']), filterSet=filter_sets,
+                                    truncated=False)
+            if collector['cancel'] or time.time() >= deadline:
+                collector['cancel'] = False
+                return None
+            time.sleep(0.05)
+
+    def _m_CancelWaitForUpdates(self, mo):
+        self.entities[mo._moId].props['cancel'] = True
+
+    def _history_collector(self, cls, entries, spec, when):
+        """Collector history palsu: entri tersaring waktu (dan entity) dari yang tertua"""
+        begin = spec.time.beginTime if spec.time else None
+        entities = None
+        if spec.entity is not None:
+            descendants = self._descendants(spec.entity.entity, [vim.ManagedEntity], True)
+            entities = {mo._moId for mo in descendants}
+            entities.add(spec.entity.entity._moId)
+        selected = [entry for entry, entity in entries
+                    if (begin is None or when(entry) >= begin)
+                    and (entities is None or entity._moId in entities)
+                    and (not getattr(spec, 'state', None) or entry.state in spec.state)]
+        selected.sort(key=when)
+        moid = f'session[fake]history{next(self._ids)}'
+        collector = cls(moid, self)
+        self.entities[moid] = FakeEntity(collector, {'entries': selected, 'position': 0})
+        return collector
+
+    def _m_CreateCollectorForEvents(self, mo, spec):
+        return self._history_collector(vim.event.EventHistoryCollector, self.events, spec,
+                                       lambda event: event.createdTime)
+
+    def _m_CreateCollectorForTasks(self, mo, spec):
+        return self._history_collector(vim.TaskHistoryCollector, self.tasks, spec,
+                                       lambda task: task.completeTime)
+
+    def _m_RewindCollector(self, mo):
+        self.entities[mo._moId].props['position'] = 0
+
+    def _m_ReadNextEvents(self, mo, max_count):
+        props = self.entities[mo._moId].props
+        page = props['entries'][props['position']:props['position'] + max_count]
+        props['position'] += len(page)
+        return page
+
+    _m_ReadNextTasks = _m_ReadNextEvents
+
+    def _m_DestroyCollector(self, mo):
+        self.entities.pop(mo._moId, None)
+
+    def _m_QueryPerf(self, mo, query_spec):
+        PM = vim.PerformanceManager
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        rnd = random.Random(len(query_spec))
+        sample_infos = {}
+        series = {}
+        results = []
+        for spec in query_spec:
+            count = spec.maxSample or 12
+            # Sampel dan deret nilai dipakai bersama semua entity dalam satu panggilan
+            if (spec.intervalId, count) not in sample_infos:
+                sample_infos[spec.intervalId, count] = [PM.SampleInfo(
+                    timestamp=now - timedelta(seconds=spec.intervalId * (count - 1 - n)),
+                    interval=spec.intervalId) for n in range(count)]
+            samples = sample_infos[spec.intervalId, count]
+            for metric in spec.metricId or []:
+                if (metric.counterId, count) not in series:
+                    series[metric.counterId, count] = PM.IntSeries(
+                        id=metric, value=[rnd.randint(0, 10000) for _ in range(count)])
+            values = [series[metric.counterId, count] for metric in spec.metricId or []]
+            results.append(PM.EntityMetric(entity=spec.entity, sampleInfo=samples, value=values))
+        return results
+
+# ============================================
+# INVENTORI SINTETIS
+# ============================================
+
+def _build_host(stub, index, cluster, datastores):
+    """Host ESXi dengan jaringan standar, vmkernel NIC dan HBA FC"""
+    pnics = [vim.host.PhysicalNic(
+        key=f'key-vim.host.PhysicalNic-vmnic{n}', device=f'vmnic{n}',
+        mac=f'00:50:56:{index // 256:02x}:{index % 256:02x}:{n:02x}', pci=f'0000:0{n}:00.0',
+        driver='ixgben', wakeOnLanSupported=False,
+        linkSpeed=vim.host.PhysicalNic.LinkSpeedDuplex(speedMb=10000, duplex=True))
+        for n in range(2)]
+    vswitch = vim.host.VirtualSwitch(
+        name='vSwitch0', key='key-vim.host.VirtualSwitch-vSwitch0', numPorts=128,
+        numPortsAvailable=120, mtu=1500, pnic=[p.key for p in pnics],
+        portgroup=['key-vim.host.PortGroup-VM Network'],
+        spec=vim.host.VirtualSwitch.Specification(numPorts=128))
+    portgroup = vim.host.PortGroup(
+        key='key-vim.host.PortGroup-VM Network', spec=vim.host.PortGroup.Specification(
+            name='VM Network', vlanId=0, vswitchName='vSwitch0',
+            policy=vim.host.NetworkPolicy(
+                security=vim.host.NetworkPolicy.SecurityPolicy(
+                    allowPromiscuous=False, macChanges=True, forgedTransmits=True),
+                nicTeaming=vim.host.NetworkPolicy.NicTeamingPolicy(
+                    nicOrder=vim.host.NetworkPolicy.NicOrderPolicy(
+                        activeNic=['vmnic0', 'vmnic1'])))))
+    vnic = vim.host.VirtualNic(
+        device='vmk0', portgroup='Management Network', key='key-vim.host.VirtualNic-vmk0',
+        spec=vim.host.VirtualNic.Specification(
+            mac=f'00:50:56:aa:{index // 256:02x}:{index % 256:02x}', mtu=1500,
+            ip=vim.host.IpConfig(dhcp=False, ipAddress=f'10.0.{index // 256}.{index % 256}',
+                                 subnetMask='255.255.0.0')))
+    hba = vim.host.FibreChannelHba(
+        key=f'hba{index}', device='vmhba1', model='QLE2692', driver='qlnativefc',
+        pci='0000:81:00.0', status='online', bus=0,
+        portWorldWideName=0x2100f4e9d4000000 + index, nodeWorldWideName=0x2000f4e9d4000000 + index,
+        speed=16, portType='fabric')
+    host = stub.add(
+        vim.HostSystem, f'host-{index}', cluster, name=f'esx{index:03d}.lab.local',
+        hardware=vim.host.HardwareInfo(
+            systemInfo=vim.host.SystemInfo(vendor='Dell Inc.', model='PowerEdge R740',
+                                           uuid=f'host-uuid-{index}'),
+            cpuPkg=[vim.host.CpuPackage(index=0, description='Intel(R) Xeon(R) Gold 6248',
+                                        hz=2500000000, busHz=100000000, vendor='intel',
+                                        threadId=[0])],
+            cpuInfo=vim.host.CpuInfo(numCpuPackages=2, numCpuCores=40, numCpuThreads=80,
+                                     hz=2500000000),
+            memorySize=768 * 1024**3),
+        config=vim.host.ConfigInfo(
+            host=vim.HostSystem(f'host-{index}', stub),
+            product=vim.AboutInfo(name='VMware ESXi', version='8.0.2', build='22380479'),
+            network=vim.host.NetworkInfo(pnic=pnics, vswitch=[vswitch], portgroup=[portgroup],
+                                         vnic=[vnic]),
+            storageDevice=vim.host.StorageDeviceInfo(hostBusAdapter=[hba])),
+        runtime=vim.host.RuntimeInfo(connectionState='connected', powerState='poweredOn',
+                                     inMaintenanceMode=False),
+        summary=vim.host.Summary(hardware=vim.host.Summary.HardwareSummary(
+            vendor='Dell Inc.', model='PowerEdge R740', uuid=f'host-uuid-{index}',
+            memorySize=768 * 1024**3,
+            cpuModel='Intel(R) Xeon(R) Gold 6248', cpuMhz=2500, numCpuPkgs=2, numCpuCores=40,
+            numCpuThreads=80, numNics=len(pnics), numHBAs=1)),
+        overallStatus='green', datastore=datastores, vm=[])
+    stub.entities[cluster._moId].props['host'].append(host)
+    return host
+
+def _disk_layout(key, chain):
+    """DiskLayout layoutEx dengan satu unit chain per file"""
+    return vim.vm.FileLayoutEx.DiskLayout(
+        key=key, chain=[vim.vm.FileLayoutEx.DiskUnit(fileKey=[k]) for k in chain])
+
+def _build_snapshots(stub, vm_moid, depth, layout_disks, files, file_keys, rnd):
+    """Rantai snapshot sedalam depth beserta file delta di layoutEx"""
+    created = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    nodes = []
+    layouts = []
+    for level in range(depth):
+        snapshot = stub.add(vim.vm.Snapshot, f'snapshot-{vm_moid}-{level}', name=f'snap{level}')
+        nodes.append(vim.vm.SnapshotTree(
+            snapshot=snapshot, vm=vim.VirtualMachine(vm_moid, stub), name=f'snap{level}',
+            description='', id=level + 1, createTime=created + timedelta(days=level),
+            state='poweredOn', quiesced=False, childSnapshotList=[]))
+        disks = []
+        for disk_key, chain in layout_disks.items():
+            key = next(file_keys)
+            files.append(vim.vm.FileLayoutEx.FileInfo(
+                key=key, name=f'[ds0] {vm_moid}/{vm_moid}-{disk_key}-{level:06d}-delta.vmdk',
+                type='diskExtent', size=rnd.randint(1, 50) * 1024**2))
+            disks.append(_disk_layout(disk_key, chain))
+            chain.append(key)
+        data_key = next(file_keys)
+        files.append(vim.vm.FileLayoutEx.FileInfo(
+            key=data_key, name=f'[ds0] {vm_moid}/{vm_moid}-Snapshot{level}.vmsn',
+            type='snapshotData', size=8 * 1024**2))
+        layouts.append(vim.vm.FileLayoutEx.SnapshotLayout(key=snapshot, dataKey=data_key,
+                                                          disk=disks))
+    for parent, child in zip(nodes, nodes[1:]):
+        parent.childSnapshotList = [child]
+    info = vim.vm.SnapshotInfo(rootSnapshotList=[nodes[0]], currentSnapshot=nodes[-1].snapshot)
+    return info, layouts
+
+def _build_vm(stub, index, folder, host, resource_pool, datastores, portgroup, disks, snapshots,
+              rnd, template=False):
+    """VM dengan disk, NIC, guest info, custom attribute dan (opsional) snapshot"""
+    moid = f'vm-{index}'
+    file_keys = itertools.count(1)
+    addresses = [(f'10.{index // 65536 + 1}.{index // 256 % 256}.{index % 256}', 16),
+                 (f'fe80::250:56ff:febb:{index % 65536:x}', 64)]
+    files = [vim.vm.FileLayoutEx.FileInfo(key=0, name=f'[ds0] {moid}/{moid}.vmx', type='config',
+                                          size=4096)]
+    devices = []
+    layout_disks = {}
+    for d in range(disks):
+        datastore = datastores[(index + d) % len(datastores)]
+        devices.append(vim.vm.device.VirtualDisk(
+            key=2000 + d, controllerKey=1000, unitNumber=d, capacityInKB=(40 + d) * 1024**2,
+            deviceInfo=vim.Description(label=f'Hard disk {d + 1}', summary=''),
+            backing=vim.vm.device.VirtualDisk.FlatVer2BackingInfo(
+                diskMode='persistent', thinProvisioned=bool(d % 2),
+                fileName=f'[{datastore.name}] {moid}/{moid}_{d}.vmdk', datastore=datastore)))
+        key = next(file_keys)
+        files.append(vim.vm.FileLayoutEx.FileInfo(
+            key=key, name=f'[{datastore.name}] {moid}/{moid}_{d}-flat.vmdk', type='diskExtent',
+            size=(10 + d) * 1024**3))
+        layout_disks[2000 + d] = [key]
+    devices.append(vim.vm.device.VirtualVmxnet3(
+        key=4000, deviceInfo=vim.Description(label='Network adapter 1', summary='')))
+    snapshot_info = None
+    snapshot_layouts = []
+    if snapshots and index % 3 == 0:
+        snapshot_info, snapshot_layouts = _build_snapshots(
+            stub, moid, snapshots, layout_disks, files, file_keys, rnd)
+    layout = vim.vm.FileLayoutEx(file=files, snapshot=snapshot_layouts, disk=[
+        _disk_layout(key, chain) for key, chain in layout_disks.items()])
+    vm = stub.add(
+        vim.VirtualMachine, moid, folder, name=f'vm{index:05d}',
+        config=vim.vm.ConfigInfo(
+            name=f'vm{index:05d}', template=template, guestFullName='Ubuntu Linux (64-bit)',
+            guestId='ubuntu64Guest', version='vmx-19', annotation=f'note {index}',
+            uuid=f'4200{index:08d}', instanceUuid=f'5000{index:08d}',
+            hardware=vim.vm.VirtualHardware(numCPU=4, numCoresPerSocket=2, memoryMB=8192,
+                                            device=devices)),
+        runtime=vim.vm.RuntimeInfo(powerState='poweredOn', host=host, connectionState='connected'),
+        guest=vim.vm.GuestInfo(toolsStatus='toolsOk', toolsVersion='12352', net=[
+            vim.vm.GuestInfo.NicInfo(
+                network=portgroup.name,
+                macAddress=f'00:50:56:bb:{index // 256 % 256:02x}:{index % 256:02x}',
+                connected=True, deviceConfigId=4000,
+                ipAddress=[address for address, _ in addresses],
+                ipConfig=vim.net.IpConfigInfo(ipAddress=[
+                    vim.net.IpConfigInfo.IpAddress(ipAddress=address, prefixLength=prefix,
+                                                   state='preferred')
+                    for address, prefix in addresses]))]),
+        summary=vim.vm.Summary(config=vim.vm.Summary.ConfigSummary(
+            name=f'vm{index:05d}', template=template, vmPathName=f'[ds0] {moid}/{moid}.vmx',
+            numVirtualDisks=disks, numEthernetCards=1)),
+        overallStatus='green', snapshot=snapshot_info, layoutEx=layout, resourcePool=resource_pool,
+        customValue=[vim.CustomFieldsManager.StringValue(key=101, value=f'owner{index % 5}')],
+        datastore=list({d.backing.datastore._moId: d.backing.datastore for d in devices
+                        if isinstance(d, vim.vm.device.VirtualDisk)}.values()),
+        network=[portgroup])
+    stub.entities[resource_pool._moId].children.append(vm)
+    return vm
+
+def build_inventory(stub, hosts=4, vms=40, disks=4, datastores=3, clusters=2, snapshots=2, seed=1):
+    """Bangun inventori sintetis di stub, kembalikan ServiceInstance
+
+    disks adalah jumlah disk per VM; setiap VM ketiga mendapat rantai snapshot
+    sedalam snapshots. VM terakhir dijadikan template.
+    """
+    rnd = random.Random(seed)
+    clusters = max(1, min(clusters, hosts))
+    si = vim.ServiceInstance('ServiceInstance', stub)
+    root = stub.add(vim.Folder, 'group-d1', name='Datacenters')
+    datacenter = stub.add(vim.Datacenter, 'datacenter-1', root, name='DC1')
+    host_folder = stub.add(vim.Folder, 'group-h1', datacenter, name='host')
+    vm_folder = stub.add(vim.Folder, 'group-v1', datacenter, name='vm')
+    ds_folder = stub.add(vim.Folder, 'group-s1', datacenter, name='datastore')
+    net_folder = stub.add(vim.Folder, 'group-n1', datacenter, name='network')
+    content = vim.ServiceInstanceContent(
+        about=vim.AboutInfo(name='VMware vCenter Server',
+                            fullName='VMware vCenter Server (offline)',
+                            vendor='VMware', version='8.0.2', build='22617221', osType='linux-x64',
+                            apiType='VirtualCenter', apiVersion='8.0.2.0',
+                            instanceUuid='offline-uuid'),
+        rootFolder=root,
+        propertyCollector=vim.PropertyCollector('propertyCollector', stub),
+        viewManager=vim.view.ViewManager('ViewManager', stub),
+        sessionManager=vim.SessionManager('SessionManager', stub),
+        perfManager=vim.PerformanceManager('PerfMgr', stub),
+        eventManager=vim.event.EventManager('EventManager', stub),
+        taskManager=vim.TaskManager('TaskManager', stub),
+        customFieldsManager=vim.CustomFieldsManager('CustomFieldsManager', stub),
+    )
+    stub.entities['ServiceInstance'] = FakeEntity(si, {'content': content})
+    now = datetime.now(timezone.utc)
+    stub.entities['SessionManager'] = FakeEntity(content.sessionManager, {
+        'currentSession': vim.UserSession(
+            key=stub.session_id, userName='VSPHERE.LOCAL\\exporter', fullName='exporter',
+            loginTime=now, lastActiveTime=now, locale='en', messageLocale='en',
+            extensionSession=False, ipAddress='127.0.0.1', userAgent='pyvmomi', callCount=0)})
+
+    counter_names = ('cpu.usage.average.percent', 'cpu.usagemhz.average.megaHertz',
+                     'cpu.ready.summation.millisecond', 'mem.usage.average.percent',
+                     'mem.consumed.average.kiloBytes', 'mem.active.average.kiloBytes',
+                     'disk.usage.average.kiloBytesPerSecond',
+                     'net.usage.average.kiloBytesPerSecond')
+    stub.entities['CustomFieldsManager'] = FakeEntity(content.customFieldsManager, {'field': [
+        vim.CustomFieldsManager.FieldDef(key=101, name='Owner', type=str,
+                                         managedObjectType=vim.VirtualMachine)]})
+    stub.entities['PerfMgr'] = FakeEntity(content.perfManager, {'perfCounter': [
+        vim.PerformanceManager.CounterInfo(
+            key=key, rollupType=rollup, statsType='rate', level=1,
+            groupInfo=vim.ElementDescription(key=group, label=group, summary=group),
+            nameInfo=vim.ElementDescription(key=name, label=name, summary=name),
+            unitInfo=vim.ElementDescription(key=unit, label=unit, summary=unit))
+        for key, (group, name, rollup, unit) in enumerate(
+            (counter.split('.') for counter in counter_names), start=1)]})
+
+    datastore_list = [stub.add(
+        vim.Datastore, f'datastore-{i}', ds_folder, name=f'ds{i}',
+        summary=vim.Datastore.Summary(
+            name=f'ds{i}', type='VMFS', capacity=64 * 1024**4, freeSpace=(16 + i) * 1024**4,
+            accessible=True, multipleHostAccess=True, maintenanceMode='normal',
+            uncommitted=512 * 1024**3),
+        vm=[], overallStatus='green') for i in range(datastores)]
+    dvs = stub.add(vim.dvs.VmwareDistributedVirtualSwitch, 'dvs-1', net_folder, name='dvSwitch1')
+    portgroups = [stub.add(
+        vim.dvs.DistributedVirtualPortgroup, f'dvportgroup-{i}', net_folder, name=f'dvpg{i}',
+        config=vim.dvs.DistributedVirtualPortgroup.ConfigInfo(
+            key=f'dvportgroup-{i}', name=f'dvpg{i}', type='earlyBinding', numPorts=128,
+            autoExpand=True, distributedVirtualSwitch=dvs,
+            defaultPortConfig=vim.dvs.VmwareDistributedVirtualSwitch.VmwarePortConfigPolicy(
+                vlan=vim.dvs.VmwareDistributedVirtualSwitch.VlanIdSpec(vlanId=100 + i))))
+        for i in range(2)]
+
+    cluster_list = []
+    for c in range(clusters):
+        cluster = stub.add(
+            vim.ClusterComputeResource, f'domain-c{c}', host_folder, name=f'cluster{c}',
+            summary=vim.ClusterComputeResource.Summary(
+                numCpuCores=40 * hosts // clusters, numCpuThreads=80 * hosts // clusters,
+                totalMemory=768 * 1024**3 * hosts // clusters, numHosts=hosts // clusters,
+                numEffectiveHosts=hosts // clusters, totalCpu=100000),
+            configuration=vim.cluster.ConfigInfo(
+                drsConfig=vim.cluster.DrsConfigInfo(enabled=True,
+                                                    defaultVmBehavior='fullyAutomated'),
+                dasConfig=vim.cluster.DasConfigInfo(enabled=True)),
+            overallStatus='green', datastore=datastore_list, network=portgroups, host=[])
+        resource_pool = stub.add(vim.ResourcePool, f'resgroup-{c}', cluster, name='Resources')
+        cluster_list.append((cluster, resource_pool))
+    host_list = [_build_host(stub, h, cluster_list[h % clusters][0], datastore_list)
+                 for h in range(hosts)]
+    for v in range(vms):
+        host = host_list[v % hosts]
+        cluster, resource_pool = cluster_list[v % hosts % clusters]
+        vm = _build_vm(stub, v, vm_folder, host, resource_pool, datastore_list, portgroups[0],
+                       disks, snapshots, rnd, template=(v == vms - 1))
+        add_history(stub, vm, host, cluster, datacenter, now - timedelta(minutes=vms - v))
+    return si
+
+def add_history(stub, vm, host, cluster, datacenter, when):
+    """Satu event power on per VM, dan satu task power on untuk setiap VM keempat"""
+    key = len(stub.events) + 1
+    name = stub.entities[vm._moId].props['name']
+    host_name = stub.entities[host._moId].props['name']
+    stub.events.append((vim.event.VmPoweredOnEvent(
+        key=key, chainId=key, createdTime=when, userName='VSPHERE.LOCAL\\operator',
+        datacenter=vim.event.DatacenterEventArgument(name='DC1', datacenter=datacenter),
+        computeResource=vim.event.ComputeResourceEventArgument(
+            name=stub.entities[cluster._moId].props['name'], computeResource=cluster),
+        host=vim.event.HostEventArgument(name=host_name, host=host),
+        vm=vim.event.VmEventArgument(name=name, vm=vm), template=False,
+        fullFormattedMessage=f'{name} on {host_name} in DC1 is powered on'), vm))
+    if key % 4 == 1:
+        task_key = f'task-{len(stub.tasks) + 1}'
+        stub.tasks.append((vim.TaskInfo(
+            key=task_key, task=vim.Task(task_key, stub), descriptionId='VirtualMachine.powerOn',
+            entity=vm, entityName=name, state='success', cancelled=False, cancelable=False,
+            reason=vim.TaskReasonUser(userName='VSPHERE.LOCAL\\operator'), eventChainId=key,
+            queueTime=when - timedelta(seconds=3), startTime=when - timedelta(seconds=2),
+            completeTime=when), vm))
+
+def make_vcenter(max_page=100, **sizes):
+    """Stub + ServiceInstance siap pakai; penghitung round trip mulai dari nol"""
+    stub = FakeStub(max_page)
+    si = build_inventory(stub, **sizes)
+    stub.reset_counters()
+    return stub, si
+
+def install(si):
+    """Arahkan login vcenter_export_fixed ke ServiceInstance palsu
+
+    Yang diganti hanya SmartConnect/Disconnect: connect_vcenter tetap memasang
+    instrumentasi dan penjadwal di stub, dan SessionPool (--workers) tetap jalan.
+    """
+    exporter.SmartConnect = lambda **kwargs: si
+    exporter.Disconnect = lambda si: None
+
+# ============================================
+# BENCHMARK
+# ============================================
+
+def _max_rss_mb():
+    """Peak RSS proses sejak mulai (ru_maxrss dalam KB di Linux); kumulatif, hanya naik"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _measure(stub, label, func, *args):
+    """Jalankan func, catat waktu, round trip dan puncak alokasi Python"""
+    stub.reset_counters()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    return result, {
+        'step': label,
+        'seconds': round(elapsed, 4),
+        'calls': stub.calls,
+        'calls_by_method': dict(stub.calls_by_method),
+        'peak_alloc_mb': round(peak / 1024**2, 2),
+        'process_max_rss_mb': round(_max_rss_mb(), 1),
+    }
+
+def run_benchmark(sizes, page_size=None, stream=False, max_page=100):
+    """Satu putaran benchmark: collect + setiap export_* diukur terpisah"""
+    print(f"Membangun inventori sintetis {sizes}...")
+    start = time.perf_counter()
+    stub, si = make_vcenter(max_page, **sizes)
+    print(f"  ✓ {len(stub.entities)} objek dalam {time.perf_counter() - start:.1f}s\n")
+    install(si)
+
+    results = []
+    tracemalloc.start()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            cwd = os.getcwd()
+            os.chdir(workdir)
+            try:
+                with open(os.devnull, 'w', encoding='utf-8') as devnull, redirect_stdout(devnull):
+                    content = exporter.connect_vcenter().RetrieveContent()
+                    inventory, stats = _measure(
+                        stub, 'collect',
+                        exporter.InventorySnapshot(content, page_size=page_size,
+                                                   stream=stream).collect)
+                    results.append(stats)
+                    for _, filename, export_func in exporter.EXPORTERS:
+                        _, stats = _measure(stub, export_func.__name__, export_func, inventory)
+                        stats['table'] = filename
+                        results.append(stats)
+            finally:
+                os.chdir(cwd)
+    finally:
+        tracemalloc.stop()
+    return results
+
+def print_results(results):
+    """Tabel ringkas hasil benchmark"""
+    print(f"{'step':<32}{'detik':>10}{'round trip':>12}{'alloc MB':>11}{'RSS maks':>10}")
+    print("-" * 75)
+    for stats in results:
+        print(f"{stats['step']:<32}{stats['seconds']:>10.3f}{stats['calls']:>12}"
+              f"{stats['peak_alloc_mb']:>11.1f}{stats['process_max_rss_mb']:>10.1f}")
+    print("-" * 75)
+    print(f"{'total':<32}{sum(s['seconds'] for s in results):>10.3f}"
+          f"{sum(s['calls'] for s in results):>12}")
+
+def parse_args(argv=None):
+    """Opsi command line benchmark"""
+    parser = argparse.ArgumentParser(
+        description="Benchmark vcenter_export_fixed.py dengan vCenter offline")
+    parser.add_argument('--hosts', type=int, default=100)
+    parser.add_argument('--vms', type=int, default=10000)
+    parser.add_argument('--disks', type=int, default=4, help="disk per VM (default: 4)")
+    parser.add_argument('--datastores', type=int, default=20)
+    parser.add_argument('--clusters', type=int, default=10)
+    parser.add_argument('--snapshots', type=int, default=3,
+                        help="kedalaman rantai snapshot pada setiap VM ketiga (default: 3)")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--page-size', type=int, default=None,
+                        help="diteruskan ke InventorySnapshot")
+    parser.add_argument('--max-page', type=int, default=100,
+                        help="objek maksimum per halaman yang dikembalikan vCenter palsu "
+                             "(default: 100)")
+    parser.add_argument('--stream', action='store_true', help="VM diambil per halaman saat ekspor")
+    parser.add_argument('--json', metavar='FILE', help="simpan hasil ke file JSON (untuk CI)")
+    return parser.parse_args(argv)
+
+def main():
+    """Fungsi utama benchmark"""
+    args = parse_args()
+    sizes = {key: getattr(args, key)
+             for key in ('hosts', 'vms', 'disks', 'datastores', 'clusters', 'snapshots', 'seed')}
+    results = run_benchmark(sizes, args.page_size, args.stream, args.max_page)
+    print_results(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'sizes': sizes, 'stream': args.stream, 'page_size': args.page_size,
+                       'results': results}, f, indent=2)
+        print(f"\n✓ Hasil disimpan ke {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -5,12 +5,34 @@ Version: 1.1 (Fixed - Handle deleted/incomplete objects)
 """
 
 from pyVim.connect import SmartConnect, Disconnect
-from pyVmomi import vim
+from pyVmomi import SoapStubAdapter, vim, vmodl
 import ssl
 import csv
 import atexit
+import fnmatch
+import hashlib
+import http.client
+import importlib.util
+import json
+import os
+import argparse
+import io
+import mmap
+import queue
+import random
+import re
+import socket
+import sqlite3
+import sys
+import threading
+import time
 import urllib3
-from datetime import datetime
+from array import array
+from collections import Counter, defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 # Disable SSL warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -23,60 +45,569 @@ VCENTER_USER = "inisial"
 VCENTER_PASSWORD = "password"
 VCENTER_PORT = 443
 
+# Jumlah maksimum session vCenter yang dibuka pada mode paralel (--workers)
+MAX_POOL_SESSIONS = 4
+# Tipe objek dengan jumlah lebih dari ini dibagi ke beberapa worker
+SHARD_MIN_OBJECTS = 500
+# Jumlah objek per halaman RetrievePropertiesEx (maxObjects)
+DEFAULT_PAGE_SIZE = 500
+# Mode serve: batas tunggu satu panggilan WaitForUpdatesEx (detik)
+WATCH_WAIT_SECONDS = 60
+# Mode serve: alamat HTTP lokal untuk melayani tabel
+HTTP_HOST = '127.0.0.1'
+HTTP_PORT = 8765
+# Tipe objek yang tidak disimpan di memori pada mode --stream
+STREAMED_TYPES = (vim.VirtualMachine,)
+# Tipe objek yang namanya diindeks (moref -> nama) untuk resolve referensi
+NAME_INDEX_TYPES = (
+    vim.HostSystem,
+    vim.Datastore,
+    vim.DistributedVirtualSwitch,
+    vim.ClusterComputeResource,
+    vim.Network,
+)
+# Cache session (--session-cache): ID session disimpan per vCenter/user (mode 0600)
+SESSION_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.vexport_sessions')
+# Diisi dari command line (--session-cache, --keepalive)
+SESSION_CACHE = False
+KEEPALIVE_SECONDS = 0
+# Penjadwal request: batas panggilan API bersamaan (disesuaikan AIMD di antara
+# MIN dan MAX), target latency per panggilan (detik) dan batas request/detik (0 = tanpa batas)
+MIN_INFLIGHT = 1
+MAX_INFLIGHT = 8
+LATENCY_TARGET = 2.0
+MAX_RPS = 0
+# vPerf.csv: counter PerformanceManager (group.name.rollup) yang diambil per host/VM
+PERF_COUNTERS = (
+    'cpu.usage.average',
+    'cpu.usagemhz.average',
+    'cpu.ready.summation',
+    'mem.usage.average',
+    'mem.consumed.average',
+    'mem.active.average',
+    'disk.usage.average',
+    'net.usage.average',
+)
+# Interval statistik: 'realtime' (sampel 20 detik) atau interval historis dalam detik
+# (300, 1800, 7200, 86400); rentang waktu ke belakang dalam menit
+PERF_INTERVAL = 'realtime'
+PERF_WINDOW_MINUTES = 60
+# Jumlah entity (QuerySpec) per panggilan QueryPerf
+PERF_BATCH_SIZE = 250
+# vEvent.csv/vTask.csv: entri per ReadNextEvents/ReadNextTasks (maks. 1000 di vCenter)
+# dan rentang ke belakang (jam) saat belum ada high-water mark dari run sebelumnya
+HISTORY_PAGE_SIZE = 1000
+HISTORY_INITIAL_HOURS = 24
+
+# ============================================
+# SKEMA TABEL CSV
+# ============================================
+
+def bytes_to_gb(value):
+    return round(value / 1024**3, 2)
+
+def mb_to_gb(value):
+    return round(value / 1024, 2)
+
+def kb_to_gb(value):
+    return round(value / 1024**2, 2)
+
+def kb_to_mb(value):
+    return round(value / 1024, 2)
+
+def bytes_to_mb(value):
+    return round(value / 1024**2, 2)
+
+def hz_to_mhz(value):
+    return value // 1000000
+
+def round2(value):
+    return round(value, 2)
+
+def round1(value):
+    return round(value, 1)
+
+def format_time(value):
+    """Format waktu tabel CSV (YYYY-MM-DD HH:MM:SS)"""
+    return value.strftime('%Y-%m-%d %H:%M:%S')
+
+# Nilai default kolom kosong (None) per tipe
+KIND_DEFAULTS = {str: 'N/A', int: 0, float: 0, bool: False}
+
+class Column:
+    """Satu kolom tabel: nama, tipe, konversi nilai mentah dan default bila kosong
+
+    volatile: nilai turunan waktu run (mis. umur) yang tidak dihitung sebagai
+    perubahan baris pada mode --delta.
+    """
+    __slots__ = ('name', 'kind', 'convert', 'default', 'volatile')
+
+    def __init__(self, name, kind=str, convert=None, default=None, volatile=False):
+        self.name = name
+        self.kind = kind
+        self.convert = convert
+        self.default = KIND_DEFAULTS[kind] if default is None else default
+        self.volatile = volatile
+
+class TableSchema:
+    """Skema satu tabel: kolom (berurutan), kolom kunci baris dan tipe baris tuple
+
+    Baris disimpan sebagai namedtuple; konversi satuan dan default 'N/A'/0
+    diterapkan di row(), bukan di setiap exporter.
+    """
+
+    def __init__(self, filename, columns, keys):
+        self.filename = filename
+        # String biasa berarti kolom teks dengan default 'N/A'
+        self.columns = tuple(Column(c) if isinstance(c, str) else c for c in columns)
+        self.fields = tuple(column.name for column in self.columns)
+        self.keys = keys
+        self.row_type = namedtuple(re.sub(r'\W', '_', os.path.splitext(filename)[0]) + 'Row',
+                                   self.fields)
+
+    def row(self, **values):
+        """Baris tuple dari nilai mentah per nama kolom"""
+        cells = []
+        for column in self.columns:
+            value = values.get(column.name)
+            if value is None:
+                value = column.default
+            elif column.convert is not None:
+                value = column.convert(value)
+            cells.append(value)
+        return self.row_type._make(cells)
+
+# Skema tetap setiap tabel; file selalu ditulis dengan header ini.
+# Kolom *moref berisi ID managed object sebagai join key antar tabel;
+# keys adalah kolom kunci baris (dipakai mode --delta).
+TABLE_SCHEMAS = {schema.filename: schema for schema in (
+    TableSchema('vInfo.csv', (
+        'name', 'version', 'build', 'os_type', 'api_type', 'instance_uuid',
+    ), keys=('instance_uuid',)),
+    TableSchema('vCluster.csv', (
+        'name', Column('total_cpu_cores', int), Column('total_cpu_threads', int),
+        Column('total_memory_gb', float, bytes_to_gb), Column('num_hosts', int),
+        Column('num_effective_hosts', int), Column('drs_enabled', bool), 'drs_behavior',
+        Column('ha_enabled', bool), 'overall_status', 'moref',
+    ), keys=('moref',)),
+    TableSchema('vHost.csv', (
+        'name', 'manufacturer', 'model', 'cpu_model', Column('cpu_cores', int),
+        Column('cpu_threads', int), Column('cpu_mhz', int, hz_to_mhz),
+        Column('memory_gb', float, bytes_to_gb), Column('num_nics', int), 'connection_state',
+        'power_state', Column('maintenance_mode', bool), 'version', 'build', 'overall_status',
+        'moref', 'cluster', 'cluster_moref',
+    ), keys=('moref',)),
+    TableSchema('vDatastore.csv', (
+        'name', 'type', Column('capacity_gb', float, bytes_to_gb),
+        Column('free_gb', float, bytes_to_gb), Column('used_gb', float, bytes_to_gb),
+        Column('used_percent', float, round2), Column('accessible', bool),
+        Column('multiple_host_access', bool), 'maintenance_mode',
+        Column('uncommitted_gb', float, bytes_to_gb), Column('num_vms', int), 'moref',
+    ), keys=('moref',)),
+    TableSchema('vVM.csv', (
+        'name', 'power_state', Column('num_cpu', int), Column('num_cores_per_socket', int),
+        Column('memory_mb', int), Column('memory_gb', float, mb_to_gb), 'guest_os',
+        'guest_os_id', 'version', 'tools_status', 'tools_version', 'host',
+        Column('num_disks', int), Column('num_nics', int), 'overall_status',
+        Column('annotation', default=''), 'moref', 'host_moref',
+    ), keys=('moref',)),
+    TableSchema('vDisk.csv', (
+        'vm_name', 'label', Column('capacity_gb', float, kb_to_gb),
+        Column('capacity_mb', float, kb_to_mb), 'disk_mode', Column('thin_provisioned', bool),
+        'disk_type', 'datastore', 'controller', 'unit_number', 'vm_moref',
+        Column('device_key', int), 'datastore_moref',
+    ), keys=('vm_moref', 'device_key')),
+    TableSchema('vSnapshot.csv', (
+        'vm_name', 'snapshot_name', Column('description', default=''),
+        Column('create_time', convert=format_time), 'state', Column('quiesced', bool),
+        Column('parent_snapshot', default=''), Column('id', int), 'vm_moref', 'snapshot_moref',
+        Column('delta_size_mb', float, bytes_to_mb), Column('state_size_mb', float, bytes_to_mb),
+        Column('age_days', int, volatile=True),
+    ), keys=('snapshot_moref',)),
+    TableSchema('vPortgroup_Std.csv', (
+        'host', 'name', 'vlan_id', 'vswitch', Column('num_ports', int),
+        Column('security_allow_promiscuous', bool), Column('security_mac_changes', bool),
+        Column('security_forged_transmits', bool), 'host_moref',
+    ), keys=('host_moref', 'name')),
+    TableSchema('vPortgroup_DV.csv', (
+        'name', 'dvswitch', 'type', Column('num_ports', int), 'vlan_id', 'vlan_type',
+        'port_binding', Column('auto_expand', bool), 'moref', 'dvswitch_moref',
+    ), keys=('moref',)),
+    TableSchema('vSwitch_Std.csv', (
+        'host', 'name', Column('num_ports', int), Column('num_ports_available', int),
+        Column('mtu', int), Column('num_physical_nics', int), Column('physical_nics', default=''),
+        Column('num_portgroups', int), 'host_moref',
+    ), keys=('host_moref', 'name')),
+    TableSchema('vVMkernelNIC.csv', (
+        'host', 'device', 'portgroup', 'dvport_id', 'mac', 'ip', 'subnet_mask',
+        Column('dhcp', bool), Column('mtu', int, default=1500), 'host_moref',
+    ), keys=('host_moref', 'device')),
+    TableSchema('vPNIC.csv', (
+        'host', 'device', 'mac', 'pci', 'driver', Column('link_speed_mb', default='Down'),
+        'duplex', Column('wol_supported', bool), Column('vswitch', default='Not assigned'),
+        'host_moref',
+    ), keys=('host_moref', 'device')),
+    TableSchema('vHBA.csv', (
+        'host', 'device', Column('type', default='Unknown'), 'model', 'driver', 'pci', 'status',
+        'wwn_or_iqn', 'speed', 'host_moref',
+    ), keys=('host_moref', 'device')),
+    TableSchema('vPerf.csv', (
+        'entity_type', 'name', 'counter', 'unit', Column('instance', default=''),
+        Column('interval', int), Column('samples', int),
+        Column('start_time', convert=format_time), Column('end_time', convert=format_time),
+        Column('average', float, round2), Column('minimum', float, round2),
+        Column('maximum', float, round2), Column('latest', float, round2), 'moref',
+    ), keys=('moref', 'counter', 'instance')),
+    TableSchema('vEvent.csv', (
+        Column('key', int), Column('created_time', convert=format_time), 'event_type',
+        Column('user', default=''), Column('datacenter', default=''),
+        Column('cluster', default=''), Column('host', default=''), Column('vm', default=''),
+        Column('datastore', default=''), Column('message', default=''), Column('chain_id', int),
+        Column('host_moref', default=''), Column('vm_moref', default=''),
+    ), keys=('key',)),
+    TableSchema('vTask.csv', (
+        'key', 'name', Column('entity_name', default=''), 'state', Column('user', default=''),
+        Column('queue_time', convert=format_time), Column('start_time', convert=format_time),
+        Column('complete_time', convert=format_time),
+        Column('duration_seconds', float, round1, default='N/A'),
+        Column('error', default=''), Column('event_chain_id', int),
+        Column('entity_moref', default=''),
+    ), keys=('key',)),
+    TableSchema('vCustomAttr.csv', (
+        'vm_name', 'attribute', Column('value', default=''), Column('field_key', int), 'vm_moref',
+    ), keys=('vm_moref', 'field_key')),
+    TableSchema('vGuestNet.csv', (
+        'vm_name', Column('nic_key', int), 'network', 'mac', Column('connected', bool),
+        Column('ip_address', default=''), Column('ip_version', default=''),
+        Column('prefix_length', int), Column('ip_state', default=''), 'vm_moref',
+    ), keys=('vm_moref', 'nic_key', 'ip_address')),
+    # Tabel turunan tahap rollup (--rollup), dihitung dari tabel di atas
+    TableSchema('vRollup_Cluster.csv', (
+        'cluster', Column('num_hosts', int), Column('num_vms', int),
+        Column('num_vms_powered_on', int), Column('pcpu_cores', int),
+        Column('pram_gb', float, round2), Column('vcpu', int), Column('vcpu_powered_on', int),
+        Column('vram_gb', float, round2), Column('vram_powered_on_gb', float, round2),
+        Column('vcpu_per_pcpu', float, round2, default='N/A'),
+        Column('vram_per_pram', float, round2, default='N/A'),
+        Column('vms_per_host', float, round2, default='N/A'), Column('max_vms_per_host', int),
+        Column('disk_provisioned_gb', float, round2), 'cluster_moref',
+    ), keys=('cluster_moref',)),
+    TableSchema('vRollup_Datastore.csv', (
+        'datastore', 'type', Column('capacity_gb', float, round2), Column('free_gb', float, round2),
+        Column('used_gb', float, round2), Column('uncommitted_gb', float, round2),
+        Column('provisioned_gb', float, round2),
+        Column('provisioned_percent', float, round2, default='N/A'),
+        Column('uncommitted_per_free', float, round2, default='N/A'), Column('num_vms', int),
+        Column('num_disks', int), Column('num_thin_disks', int),
+        Column('disk_capacity_gb', float, round2), 'datastore_moref',
+    ), keys=('datastore_moref',)),
+)}
+
+# Jumlah baris yang ditampung sebelum ditulis ke file
+CSV_BATCH_SIZE = 1000
+
 # ============================================
 # FUNGSI HELPER
 # ============================================
 
-def connect_vcenter():
-    """Koneksi ke vCenter"""
+def connect_vcenter(register_exit=True, slot=0):
+    """Koneksi ke vCenter
+
+    Dengan SESSION_CACHE, session run sebelumnya dipakai ulang selama masih valid.
+    slot membedakan cache session milik SessionPool.
+    """
     print(f"Menghubungkan ke vCenter: {VCENTER_HOST}...")
     context = ssl._create_unverified_context()
-    si = SmartConnect(
-        host=VCENTER_HOST,
-        user=VCENTER_USER,
-        pwd=VCENTER_PASSWORD,
-        port=VCENTER_PORT,
-        sslContext=context
-    )
-    atexit.register(Disconnect, si)
+    si = resume_session(context, slot) if SESSION_CACHE else None
+    if si is None:
+        si = with_retry(
+            "Login vCenter", SmartConnect,
+            host=VCENTER_HOST,
+            user=VCENTER_USER,
+            pwd=VCENTER_PASSWORD,
+            port=VCENTER_PORT,
+            sslContext=context
+        )
+        if SESSION_CACHE:
+            save_session(si, slot)
+    METRICS.instrument(si._stub)
+    SCHEDULER.attach(si._stub)
+    if KEEPALIVE_SECONDS > 0:
+        start_keepalive(si, KEEPALIVE_SECONDS)
+    if register_exit:
+        atexit.register(disconnect_vcenter, si)
     print("✓ Koneksi berhasil!\n")
     return si
 
-def get_all_objs(content, vimtype):
-    """Mengambil semua objek dengan tipe tertentu - dengan error handling"""
-    obj = {}
-    container = content.viewManager.CreateContainerView(
-        content.rootFolder, vimtype, True
-    )
-    for managed_object_ref in container.view:
-        try:
-            # Coba akses name untuk validasi objek masih ada
-            name = managed_object_ref.name
-            obj.update({managed_object_ref: name})
-        except Exception as e:
-            # Skip objek yang sudah dihapus atau belum selesai dibuat
-            if "ManagedObjectNotFound" in str(e) or "has already been deleted" in str(e):
-                print(f"  ⚠ Skipping deleted/incomplete object")
-            else:
-                print(f"  ⚠ Skipping object due to: {e}")
-            continue
-    container.Destroy()
-    return obj
+def disconnect_vcenter(si):
+    """Akhiri koneksi; session yang di-cache tidak di-logout agar bisa dipakai run berikutnya"""
+    stop = _keepalives.pop(id(si._stub), None)
+    if stop is not None:
+        stop.set()
+    if SESSION_CACHE:
+        si._stub.DropConnections()
+    else:
+        Disconnect(si)
 
-def write_csv(filename, data, fieldnames=None):
-    """Menulis data ke CSV"""
-    if not data:
-        print(f"  ⚠ Tidak ada data untuk {filename}")
-        return
+def session_cache_path(slot=0):
+    """File cache session untuk vCenter/user saat ini"""
+    name = re.sub(r'[^A-Za-z0-9._-]', '_', f'{VCENTER_HOST}_{VCENTER_PORT}_{VCENTER_USER}_{slot}')
+    return os.path.join(SESSION_CACHE_DIR, name + '.json')
+
+def save_session(si, slot=0):
+    """Simpan ID session ke file yang hanya bisa dibaca pemiliknya"""
+    os.makedirs(SESSION_CACHE_DIR, mode=0o700, exist_ok=True)
+    path = session_cache_path(slot)
+    tmp_path = path + '.tmp'
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.chmod(tmp_path, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump({
+            'host': VCENTER_HOST,
+            'port': VCENTER_PORT,
+            'user': VCENTER_USER,
+            'version': si._stub.version,
+            'session_id': si._stub.GetSessionId(),
+            'saved': datetime.now().isoformat(timespec='seconds'),
+        }, f)
+    os.replace(tmp_path, path)
+
+def resume_session(context, slot=0):
+    """Pakai ulang session dari cache; None jika tidak ada atau sudah kedaluwarsa
+
+    Validasi cukup dua panggilan ringan (RetrieveServiceContent + currentSession),
+    tanpa negosiasi versi dan Login.
+    """
+    try:
+        with open(session_cache_path(slot), encoding='utf-8') as f:
+            cached = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"  ⚠ Cache session tidak terbaca, login ulang: {e}")
+        return None
+    if cached.get('user') != VCENTER_USER or not cached.get('session_id'):
+        return None
+    stub = SoapStubAdapter(host=VCENTER_HOST, port=VCENTER_PORT, version=cached['version'],
+                           sslContext=context, sessionId=cached['session_id'])
+    METRICS.instrument(stub)
+    si = vim.ServiceInstance('ServiceInstance', stub)
+    try:
+        if si.RetrieveContent().sessionManager.currentSession is not None:
+            print(f"  ↻ Memakai session tersimpan ({cached.get('saved', '?')})")
+            return si
+    except Exception as e:
+        print(f"  ⚠ Validasi session tersimpan gagal: {e}")
+    stub.DropConnections()
+    print("  ℹ Session tersimpan sudah kedaluwarsa, login ulang")
+    return None
+
+# Event stop thread keep-alive per stub
+_keepalives = {}
+
+def start_keepalive(si, interval):
+    """Thread yang memanggil CurrentTime berkala agar session tidak idle timeout"""
+    stop = threading.Event()
+
+    def ping():
+        with METRICS.scope('keepalive', timed=False):
+            while not stop.wait(interval):
+                try:
+                    si.CurrentTime()
+                except Exception as e:
+                    print(f"  ⚠ Keep-alive session gagal: {e}")
+
+    previous = _keepalives.pop(id(si._stub), None)
+    if previous is not None:
+        previous.set()
+    _keepalives[id(si._stub)] = stop
+    threading.Thread(target=ping, name='session-keepalive', daemon=True).start()
+
+class CsvSink:
+    """Penulis CSV streaming: file dibuka di awal, baris (tuple) ditulis per batch"""
+
+    def __init__(self, filename, fields=None, batch_size=CSV_BATCH_SIZE, quiet=False,
+                 stream=None, progress=None):
+        self.filename = filename
+        self.fields = fields if fields is not None else TABLE_SCHEMAS[filename].fields
+        self.batch_size = batch_size
+        self.quiet = quiet
+        self.count = 0
+        self._buffer = []
+        # progress: checkpoint --resume; flush hanya di batas objek (lihat TableProgress)
+        self.progress = progress
+        self.resumed = progress is not None and progress.offset is not None
+        # stream: tulis ke file object yang sudah terbuka (mis. respons HTTP)
+        self._owns_file = stream is None
+        if stream is not None:
+            self._file = stream
+        elif self.resumed:
+            # Lanjutkan file run sebelumnya; baris setelah checkpoint terakhir dibuang
+            self._file = open(filename, 'r+', newline='', encoding='utf-8')
+            self._file.truncate(progress.offset)
+            self._file.seek(progress.offset)
+        else:
+            self._file = open(filename, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        if not self.resumed:
+            self._writer.writerow(self.fields)
+        self.flush()
+        if progress is not None:
+            progress.sink = self
+
+    @property
+    def buffered(self):
+        return len(self._buffer)
+
+    def write(self, row):
+        """Tambah satu baris; ditulis ke disk setiap batch_size baris"""
+        self._buffer.append(row)
+        self.count += 1
+        if len(self._buffer) >= self.batch_size and self.progress is None:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._writer.writerows(self._buffer)
+            self._buffer.clear()
+        self._file.flush()
+        if self.progress is not None:
+            self.progress.commit(self._file.tell())
+
+    def close(self):
+        self.flush()
+        if self._owns_file:
+            self._file.close()
+        if self.progress is not None:
+            self.progress.close()
+        if self.quiet:
+            return
+        if self.resumed:
+            print(f"  ✓ {self.filename} (+{self.count} records, dilanjutkan dari checkpoint)")
+        elif self.count:
+            print(f"  ✓ {self.filename} ({self.count} records)")
+        else:
+            print(f"  ⚠ Tidak ada data untuk {self.filename} (hanya header)")
+
+    def abort(self):
+        """Tutup file setelah exporter gagal; tabel ditandai tidak lengkap
+
+        Dengan checkpoint, baris yang belum di-commit dibuang karena --resume
+        mengulang objeknya; tanpa checkpoint, baris yang sudah ada tetap ditulis.
+        """
+        if self.progress is None:
+            self.flush()
+        else:
+            self._buffer.clear()
+            self.progress.close()
+        if self._owns_file:
+            self._file.close()
+        if not self.quiet:
+            print(f"  ✗ {self.filename} tidak lengkap (berhenti karena error)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+class TableSink:
+    """Membentuk baris dari skema tabel dan meneruskannya ke beberapa sink sekaligus"""
+
+    def __init__(self, schema, sinks, checkpoint=None):
+        self.schema = schema
+        self.sinks = sinks
+        self.filename = schema.filename
+        self.checkpoint = checkpoint
+        self.count = 0
+
+    def write(self, **values):
+        """Tulis satu baris dari nilai mentah per kolom (lihat TableSchema.row)"""
+        row = self.schema.row(**values)
+        self.count += 1
+        for sink in self.sinks:
+            sink.write(row)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+        _table_capture.progress = None
+        METRICS.add('rows_written', self.count)
+        if self.checkpoint is not None:
+            self.checkpoint.mark(self.filename, 'done')
+
+    def abort(self):
+        """Tutup sink setelah exporter gagal; sink boleh menolak commit state"""
+        for sink in self.sinks:
+            sink.abort()
+        _table_capture.progress = None
+        METRICS.add('rows_written', self.count)
+        if self.checkpoint is not None:
+            self.checkpoint.mark(self.filename, 'partial')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+# Factory sink tambahan (filename -> sink atau None) yang dipasang main() sesuai opsi
+EXTRA_SINKS = []
+
+# Tujuan tabel per thread; diisi capture_tables() (mis. untuk respons HTTP)
+_table_capture = threading.local()
+
+@contextmanager
+def capture_tables(stream):
+    """Arahkan semua tabel yang dibuka di thread ini ke stream, bukan ke file"""
+    _table_capture.stream = stream
+    try:
+        yield stream
+    finally:
+        _table_capture.stream = None
+
+def open_table(filename):
+    """Buka sink untuk satu tabel: file CSV + sink tambahan yang aktif
+
+    Saat CHECKPOINT aktif, progress objek tabel dicatat untuk --resume.
+    """
+    schema = TABLE_SCHEMAS[filename]
+    stream = getattr(_table_capture, 'stream', None)
+    if stream is not None:
+        return TableSink(schema, [CsvSink(filename, quiet=True, stream=stream)])
+    progress = None
+    if CHECKPOINT is not None:
+        # Sink tambahan (mis. delta) butuh semua baris: tabel setengah jadi diulang dari awal
+        progress = CHECKPOINT.open_progress(filename, resume=not EXTRA_SINKS)
+    _table_capture.progress = progress
+    sinks = [CsvSink(filename, progress=progress)]
+    # Factory boleh mengembalikan None untuk tabel yang tidak ditanganinya
+    sinks.extend(sink for sink in (factory(filename) for factory in EXTRA_SINKS)
+                 if sink is not None)
+    return TableSink(schema, sinks, CHECKPOINT)
 
-    if fieldnames is None:
-        fieldnames = data[0].keys()
+def write_csv(filename, data):
+    """Menulis data (list atau generator dict nilai per kolom) ke CSV"""
+    with open_table(filename) as sink:
+        for values in data:
+            sink.write(**values)
 
-    with open(filename, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(data)
-    print(f"  ✓ {filename} ({len(data)} records)")
+def checkpointed(items, key):
+    """Lewati item yang sudah tertulis di run sebelumnya (--resume) dan catat item selesai"""
+    progress = getattr(_table_capture, 'progress', None)
+    for item in items:
+        if progress is not None and progress.skip(key(item)):
+            continue
+        yield item
+        if progress is not None:
+            progress.completed(key(item))
+
+def moref_id(obj, default='N/A'):
+    """ID managed object reference (mis. 'vm-123'), tanpa round trip"""
+    return obj._moId if obj is not None else default
 
 def safe_get_property(obj, property_chain, default='N/A'):
     """Safely get nested property with fallback"""
@@ -89,510 +620,3114 @@ def safe_get_property(obj, property_chain, default='N/A'):
         return default
 
 # ============================================
-# FUNGSI EKSPOR DATA
+# INSTRUMENTASI (METRIK RUN)
 # ============================================
 
-def export_vcenter_info(content):
-    """1. Export vCenter Info"""
-    print("Mengekspor vCenter Info...")
-    try:
-        data = [{
-            'name': content.about.name,
-            'version': content.about.version,
-            'build': content.about.build,
-            'os_type': content.about.osType,
-            'api_type': content.about.apiType,
-            'instance_uuid': content.about.instanceUuid
-        }]
-        write_csv('vInfo.csv', data)
-    except Exception as e:
-        print(f"  ✗ Error: {e}")
+# File metrik yang ditulis di akhir setiap run (JSON + Prometheus text format)
+METRICS_JSON = 'vexport_metrics.json'
+METRICS_PROM = 'vexport_metrics.prom'
+# Counter yang dicatat per tahap (connect, collect, export_*, ...)
+METRIC_FIELDS = ('seconds', 'api_calls', 'bytes_received', 'skipped_objects', 'rows_written',
+                 'retries', 'throttled_seconds')
 
-def export_clusters(content):
-    """2. Export Clusters"""
-    print("Mengekspor Clusters...")
-    data = []
-    for cluster in get_all_objs(content, [vim.ClusterComputeResource]):
-        try:
-            data.append({
-                'name': cluster.name,
-                'total_cpu_cores': safe_get_property(cluster, 'summary.numCpuCores', 0),
-                'total_cpu_threads': safe_get_property(cluster, 'summary.numCpuThreads', 0),
-                'total_memory_gb': round(safe_get_property(cluster, 'summary.totalMemory', 0) / 1024**3, 2),
-                'num_hosts': safe_get_property(cluster, 'summary.numHosts', 0),
-                'num_effective_hosts': safe_get_property(cluster, 'summary.numEffectiveHosts', 0),
-                'drs_enabled': safe_get_property(cluster, 'configuration.drsConfig.enabled', False),
-                'drs_behavior': safe_get_property(cluster, 'configuration.drsConfig.defaultVmBehavior', 'N/A'),
-                'ha_enabled': safe_get_property(cluster, 'configuration.dasConfig.enabled', False),
-                'overall_status': safe_get_property(cluster, 'overallStatus', 'N/A')
-            })
-        except Exception as e:
-            print(f"  ⚠ Error pada cluster {cluster.name}: {e}")
-    write_csv('vCluster.csv', data)
+class MeteredResponse:
+    """Proxy respons HTTP yang menghitung byte body SOAP yang dibaca"""
 
-def export_hosts(content):
-    """3. Export Hosts"""
-    print("Mengekspor Hosts...")
-    data = []
-    for host in get_all_objs(content, [vim.HostSystem]):
-        try:
-            cpu_pkg = host.hardware.cpuPkg[0].description if host.hardware.cpuPkg else 'N/A'
-            data.append({
-                'name': host.name,
-                'manufacturer': safe_get_property(host, 'hardware.systemInfo.vendor', 'N/A'),
-                'model': safe_get_property(host, 'hardware.systemInfo.model', 'N/A'),
-                'cpu_model': cpu_pkg,
-                'cpu_cores': safe_get_property(host, 'hardware.cpuInfo.numCpuCores', 0),
-                'cpu_threads': safe_get_property(host, 'hardware.cpuInfo.numCpuThreads', 0),
-                'cpu_mhz': safe_get_property(host, 'hardware.cpuInfo.hz', 0) // 1000000,
-                'memory_gb': round(safe_get_property(host, 'hardware.memorySize', 0) / 1024**3, 2),
-                'num_nics': len(host.config.network.pnic) if host.config.network.pnic else 0,
-                'connection_state': safe_get_property(host, 'runtime.connectionState', 'N/A'),
-                'power_state': safe_get_property(host, 'runtime.powerState', 'N/A'),
-                'maintenance_mode': safe_get_property(host, 'runtime.inMaintenanceMode', False),
-                'version': safe_get_property(host, 'config.product.version', 'N/A'),
-                'build': safe_get_property(host, 'config.product.build', 'N/A'),
-                'overall_status': safe_get_property(host, 'overallStatus', 'N/A')
-            })
-        except Exception as e:
-            print(f"  ⚠ Error pada host: {e}")
-    write_csv('vHost.csv', data)
+    def __init__(self, response, metrics):
+        self._response = response
+        self._metrics = metrics
 
-def export_datastores(content):
-    """4. Export Datastores"""
-    print("Mengekspor Datastores...")
-    data = []
-    for ds in get_all_objs(content, [vim.Datastore]):
-        try:
-            capacity_gb = round(safe_get_property(ds, 'summary.capacity', 0) / 1024**3, 2)
-            free_gb = round(safe_get_property(ds, 'summary.freeSpace', 0) / 1024**3, 2)
-            used_gb = capacity_gb - free_gb
-            used_percent = round((used_gb / capacity_gb * 100), 2) if capacity_gb > 0 else 0
-
-            data.append({
-                'name': ds.name,
-                'type': safe_get_property(ds, 'summary.type', 'N/A'),
-                'capacity_gb': capacity_gb,
-                'free_gb': free_gb,
-                'used_gb': used_gb,
-                'used_percent': used_percent,
-                'accessible': safe_get_property(ds, 'summary.accessible', False),
-                'multiple_host_access': safe_get_property(ds, 'summary.multipleHostAccess', False),
-                'maintenance_mode': safe_get_property(ds, 'summary.maintenanceMode', 'N/A'),
-                'uncommitted_gb': round(safe_get_property(ds, 'summary.uncommitted', 0) / 1024**3, 2),
-                'num_vms': len(ds.vm) if ds.vm else 0
-            })
-        except Exception as e:
-            print(f"  ⚠ Error pada datastore: {e}")
-    write_csv('vDatastore.csv', data)
+    def read(self, *args):
+        data = self._response.read(*args)
+        self._metrics.add('bytes_received', len(data))
+        return data
 
-def export_vms(content):
-    """5. Export VMs"""
-    print("Mengekspor VMs...")
-    data = []
-    skipped = 0
+    def __getattr__(self, name):
+        return getattr(self._response, name)
 
-    for vm in get_all_objs(content, [vim.VirtualMachine]):
-        try:
-            # Skip templates
-            if safe_get_property(vm, 'config.template', False):
-                continue
+class MeteredConnection:
+    """Proxy koneksi HTTP milik SoapStubAdapter; respons dibungkus MeteredResponse"""
 
-            # Count disks and NICs safely
-            num_disks = 0
-            num_nics = 0
-            try:
-                if vm.config and vm.config.hardware and vm.config.hardware.device:
-                    for device in vm.config.hardware.device:
-                        if isinstance(device, vim.vm.device.VirtualDisk):
-                            num_disks += 1
-                        elif isinstance(device, vim.vm.device.VirtualEthernetCard):
-                            num_nics += 1
-            except:
-                pass
-
-            data.append({
-                'name': vm.name,
-                'power_state': safe_get_property(vm, 'runtime.powerState', 'N/A'),
-                'num_cpu': safe_get_property(vm, 'config.hardware.numCPU', 0),
-                'num_cores_per_socket': safe_get_property(vm, 'config.hardware.numCoresPerSocket', 0),
-                'memory_mb': safe_get_property(vm, 'config.hardware.memoryMB', 0),
-                'memory_gb': round(safe_get_property(vm, 'config.hardware.memoryMB', 0) / 1024, 2),
-                'guest_os': safe_get_property(vm, 'config.guestFullName', 'N/A'),
-                'guest_os_id': safe_get_property(vm, 'config.guestId', 'N/A'),
-                'version': safe_get_property(vm, 'config.version', 'N/A'),
-                'tools_status': safe_get_property(vm, 'guest.toolsStatus', 'N/A'),
-                'tools_version': safe_get_property(vm, 'guest.toolsVersion', 'N/A'),
-                'host': vm.runtime.host.name if vm.runtime and vm.runtime.host else 'N/A',
-                'num_disks': num_disks,
-                'num_nics': num_nics,
-                'overall_status': safe_get_property(vm, 'overallStatus', 'N/A'),
-                'annotation': safe_get_property(vm, 'config.annotation', '')
-            })
-        except Exception as e:
-            skipped += 1
-            print(f"  ⚠ Skipping VM due to error: {str(e)[:80]}")
+    def __init__(self, connection, metrics):
+        self._connection = connection
+        self._metrics = metrics
 
-    write_csv('vVM.csv', data)
-    if skipped > 0:
-        print(f"  ℹ Skipped {skipped} VMs due to errors")
+    def getresponse(self):
+        return MeteredResponse(self._connection.getresponse(), self._metrics)
 
-def export_disks(content):
-    """6. Export Virtual Disks"""
-    print("Mengekspor Virtual Disks...")
-    data = []
-    for vm in get_all_objs(content, [vim.VirtualMachine]):
-        try:
-            if safe_get_property(vm, 'config.template', False):
-                continue
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
 
-            if not vm.config or not vm.config.hardware or not vm.config.hardware.device:
-                continue
+class RunMetrics:
+    """Metrik satu run: waktu, panggilan API, byte diterima, objek dilewati, baris ditulis
 
-            for device in vm.config.hardware.device:
-                try:
-                    if isinstance(device, vim.vm.device.VirtualDisk):
-                        datastore_name = 'N/A'
-                        if hasattr(device.backing, 'datastore') and device.backing.datastore:
-                            try:
-                                datastore_name = device.backing.datastore.name
-                            except:
-                                pass
-
-                        data.append({
-                            'vm_name': vm.name,
-                            'label': safe_get_property(device, 'deviceInfo.label', 'N/A'),
-                            'capacity_gb': round(safe_get_property(device, 'capacityInKB', 0) / 1024**2, 2),
-                            'capacity_mb': round(safe_get_property(device, 'capacityInKB', 0) / 1024, 2),
-                            'disk_mode': safe_get_property(device, 'backing.diskMode', 'N/A'),
-                            'thin_provisioned': safe_get_property(device, 'backing.thinProvisioned', False),
-                            'disk_type': type(device.backing).__name__ if device.backing else 'N/A',
-                            'datastore': datastore_name,
-                            'controller': safe_get_property(device, 'controllerKey', 'N/A'),
-                            'unit_number': safe_get_property(device, 'unitNumber', 'N/A')
-                        })
-                except:
-                    continue
-        except Exception as e:
-            print(f"  ⚠ Error processing disks for VM: {str(e)[:60]}")
-    write_csv('vDisk.csv', data)
+    Counter dicatat ke tahap aktif milik thread pemanggil (lihat scope()).
+    """
 
-def export_snapshots(content):
-    """7. Export Snapshots"""
-    print("Mengekspor Snapshots...")
-    data = []
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
 
-    def process_snapshot(vm_name, snapshot_tree, parent_name=''):
-        """Recursive function untuk memproses snapshot tree"""
-        for snapshot in snapshot_tree:
-            try:
-                create_time = snapshot.createTime.strftime('%Y-%m-%d %H:%M:%S') if snapshot.createTime else 'N/A'
-                data.append({
-                    'vm_name': vm_name,
-                    'snapshot_name': snapshot.name,
-                    'description': snapshot.description if snapshot.description else '',
-                    'create_time': create_time,
-                    'state': snapshot.state,
-                    'quiesced': snapshot.quiesced,
-                    'parent_snapshot': parent_name,
-                    'id': snapshot.id
-                })
-                # Process child snapshots
-                if snapshot.childSnapshotList:
-                    process_snapshot(vm_name, snapshot.childSnapshotList, snapshot.name)
-            except:
-                continue
+    def reset(self):
+        with self.lock:
+            self.started = time.time()
+            self.steps = {}
+            self.calls_by_method = {}
 
-    for vm in get_all_objs(content, [vim.VirtualMachine]):
-        try:
-            if vm.snapshot:
-                process_snapshot(vm.name, vm.snapshot.rootSnapshotList)
-        except Exception as e:
-            pass
+    def current_step(self):
+        return getattr(self._local, 'step', None) or 'other'
 
-    write_csv('vSnapshot.csv', data)
+    def add(self, field, value=1, step=None):
+        with self.lock:
+            counters = self.steps.setdefault(step or self.current_step(),
+                                             dict.fromkeys(METRIC_FIELDS, 0))
+            counters[field] += value
 
-def export_standard_portgroups(content):
-    """8. Export Standard Port Groups"""
-    print("Mengekspor Standard Port Groups...")
-    data = []
-    for host in get_all_objs(content, [vim.HostSystem]):
+    @contextmanager
+    def scope(self, step, timed=True):
+        """Catat counter thread ini ke step; timed=False untuk thread pembantu"""
+        previous = getattr(self._local, 'step', None)
+        self._local.step = step
+        start = time.perf_counter()
         try:
-            if not host.config or not host.config.network or not host.config.network.portgroup:
-                continue
+            yield
+        finally:
+            self._local.step = previous
+            if timed:
+                self.add('seconds', time.perf_counter() - start, step)
 
-            for pg in host.config.network.portgroup:
-                try:
-                    num_active_nics = 0
-                    try:
-                        if pg.spec.policy.nicTeaming.nicOrder.activeNic:
-                            num_active_nics = len(pg.spec.policy.nicTeaming.nicOrder.activeNic)
-                    except:
-                        pass
+    def instrument(self, stub):
+        """Bungkus stub pyVmomi: setiap InvokeMethod dihitung, byte respons diukur"""
+        if getattr(stub, '_vexport_metered', False):
+            return stub
+        invoke = stub.InvokeMethod
 
-                    data.append({
-                        'host': host.name,
-                        'name': pg.spec.name,
-                        'vlan_id': pg.spec.vlanId,
-                        'vswitch': pg.spec.vswitchName,
-                        'num_ports': num_active_nics,
-                        'security_allow_promiscuous': safe_get_property(pg, 'spec.policy.security.allowPromiscuous', False),
-                        'security_mac_changes': safe_get_property(pg, 'spec.policy.security.macChanges', False),
-                        'security_forged_transmits': safe_get_property(pg, 'spec.policy.security.forgedTransmits', False)
-                    })
-                except:
-                    continue
-        except Exception as e:
-            print(f"  ⚠ Error processing portgroups for host: {str(e)[:60]}")
-    write_csv('vPortgroup_Std.csv', data)
+        def metered_invoke(mo, info, args, *rest, **kwargs):
+            with self.lock:
+                self.calls_by_method[info.wsdlName] = self.calls_by_method.get(info.wsdlName, 0) + 1
+            self.add('api_calls')
+            return invoke(mo, info, args, *rest, **kwargs)
 
-def export_distributed_portgroups(content):
-    """9. Export Distributed Port Groups"""
-    print("Mengekspor Distributed Port Groups...")
-    data = []
-    for dvpg in get_all_objs(content, [vim.dvs.DistributedVirtualPortgroup]):
-        try:
-            config = dvpg.config
+        stub.InvokeMethod = metered_invoke
+        if hasattr(stub, 'GetConnection'):
+            get_connection = stub.GetConnection
 
-            # Get VLAN info
-            vlan_id = 'N/A'
-            vlan_type = 'N/A'
-            try:
-                if hasattr(config.defaultPortConfig, 'vlan'):
-                    vlan_config = config.defaultPortConfig.vlan
-                    if isinstance(vlan_config, vim.dvs.VmwareDistributedVirtualSwitch.VlanIdSpec):
-                        vlan_id = vlan_config.vlanId
-                        vlan_type = 'VLAN'
-                    elif isinstance(vlan_config, vim.dvs.VmwareDistributedVirtualSwitch.TrunkVlanSpec):
-                        vlan_id = str([f"{r.start}-{r.end}" for r in vlan_config.vlanId])
-                        vlan_type = 'Trunk'
-            except:
-                pass
+            def metered_connection():
+                connection = get_connection()
+                if isinstance(connection, MeteredConnection):
+                    return connection
+                return MeteredConnection(connection, self)
+
+            stub.GetConnection = metered_connection
+        stub._vexport_metered = True
+        return stub
+
+    def report(self):
+        """Ringkasan metrik sebagai dict (isi file JSON)"""
+        with self.lock:
+            steps = {step: dict(counters) for step, counters in self.steps.items()}
+            calls_by_method = dict(self.calls_by_method)
+        totals = dict.fromkeys(METRIC_FIELDS, 0)
+        for counters in steps.values():
+            counters['seconds'] = round(counters['seconds'], 4)
+            counters['throttled_seconds'] = round(counters['throttled_seconds'], 4)
+            for field in METRIC_FIELDS:
+                if field != 'seconds':
+                    totals[field] += counters[field]
+        totals['seconds'] = round(time.time() - self.started, 4)
+        totals['throttled_seconds'] = round(totals['throttled_seconds'], 4)
+        return {
+            'vcenter': VCENTER_HOST,
+            'started': datetime.fromtimestamp(self.started).isoformat(timespec='seconds'),
+            'totals': totals,
+            'steps': steps,
+            'api_calls_by_method': calls_by_method,
+            'scheduler': SCHEDULER.report(),
+        }
+
+    def prometheus(self):
+        """Metrik dalam Prometheus text exposition format"""
+        report = self.report()
+        vcenter = report['vcenter'].replace('\\', '\\\\').replace('"', '\\"')
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP vexport_{name} {help_text}")
+            lines.append(f"# TYPE vexport_{name} {kind}")
+            for labels, value in samples:
+                label_text = ','.join([f'vcenter="{vcenter}"'] + [f'{k}="{v}"' for k, v in labels])
+                lines.append(f"vexport_{name}{{{label_text}}} {value}")
+
+        steps = report['steps'].items()
+        metric('step_seconds', 'gauge', 'Wall time per tahap run.',
+               [((('step', step),), counters['seconds']) for step, counters in steps])
+        metric('api_calls_total', 'counter', 'Panggilan vSphere API per tahap.',
+               [((('step', step),), counters['api_calls']) for step, counters in steps])
+        metric('bytes_received_total', 'counter', 'Byte respons SOAP per tahap.',
+               [((('step', step),), counters['bytes_received']) for step, counters in steps])
+        metric('skipped_objects_total', 'counter', 'Objek terhapus yang dilewati per tahap.',
+               [((('step', step),), counters['skipped_objects']) for step, counters in steps])
+        metric('rows_written_total', 'counter', 'Baris tabel yang ditulis per tahap.',
+               [((('step', step),), counters['rows_written']) for step, counters in steps])
+        metric('retries_total', 'counter', 'Percobaan ulang setelah error sementara per tahap.',
+               [((('step', step),), counters['retries']) for step, counters in steps])
+        metric('throttled_seconds_total', 'counter',
+               'Waktu tunggu slot penjadwal request per tahap.',
+               [((('step', step),), counters['throttled_seconds']) for step, counters in steps])
+        scheduler = report['scheduler']
+        metric('inflight_limit', 'gauge', 'Batas panggilan API bersamaan (AIMD) saat ini.',
+               [((), scheduler['limit'])])
+        metric('inflight_peak', 'gauge', 'Puncak panggilan API bersamaan.',
+               [((), scheduler['peak_inflight'])])
+        metric('api_latency_seconds', 'gauge', 'Rata-rata bergerak latency panggilan API.',
+               [((), scheduler['latency_ewma'])])
+        metric('api_calls_by_method_total', 'counter', 'Panggilan vSphere API per method.',
+               [((('method', method),), count)
+                for method, count in report['api_calls_by_method'].items()])
+        metric('run_seconds', 'gauge', 'Durasi run sampai metrik ditulis.',
+               [((), report['totals']['seconds'])])
+        metric('run_start_timestamp_seconds', 'gauge', 'Waktu mulai run (unix).',
+               [((), round(self.started, 3))])
+        return '\n'.join(lines) + '\n'
+
+    def write(self, json_path=METRICS_JSON, prom_path=METRICS_PROM):
+        """Tulis file JSON dan Prometheus (atomic, aman untuk textfile collector)"""
+        for path, payload in ((json_path, json.dumps(self.report(), indent=2) + '\n'),
+                              (prom_path, self.prometheus())):
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        print(f"ℹ Metrik run ditulis ke {json_path} dan {prom_path}")
+
+# Metrik proses ini; direset di awal setiap run
+METRICS = RunMetrics()
+
+# ============================================
+# PENJADWAL REQUEST (AIMD)
+# ============================================
+
+# Method long-poll yang tidak dijadwalkan (menunggu lama tanpa membebani vCenter)
+UNSCHEDULED_METHODS = frozenset(('WaitForUpdatesEx', 'CancelWaitForUpdates'))
+# Faktor pengurangan batas saat vCenter melambat atau error (multiplicative decrease)
+DECREASE_FACTOR = 0.5
+# Bobot sampel terbaru pada rata-rata bergerak latency
+LATENCY_SMOOTHING = 0.2
+
+class RequestScheduler:
+    """Penjadwal semua panggilan vSphere API milik proses ini
+
+    Jumlah panggilan bersamaan dibatasi `limit` yang disesuaikan AIMD: naik +1 per
+    satu "jendela" panggilan yang cepat dan sukses, dikali DECREASE_FACTOR bila
+    latency melewati target atau terjadi error sementara (paling sering sekali per
+    rentang latency). max_rps membatasi laju request global.
+    """
 
-            dvs_name = 'N/A'
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.configure()
+
+    def configure(self, min_inflight=MIN_INFLIGHT, max_inflight=MAX_INFLIGHT,
+                  latency_target=LATENCY_TARGET, max_rps=MAX_RPS):
+        with self.cond:
+            self.min_inflight = max(1, min_inflight)
+            self.max_inflight = max(self.min_inflight, max_inflight)
+            self.latency_target = latency_target
+            self.interval = 1.0 / max_rps if max_rps > 0 else 0.0
+            self.limit = float(self.max_inflight)
+            self.inflight = 0
+            self.peak_inflight = 0
+            self.latency_ewma = 0.0
+            self.decreases = 0
+            self.errors = 0
+            self._next_slot = 0.0
+            self._last_decrease = 0.0
+            self.cond.notify_all()
+
+    def acquire(self):
+        """Tunggu slot bebas (dan giliran rps); waktu tunggu dicatat sebagai throttled"""
+        start = time.perf_counter()
+        with self.cond:
+            while self.inflight >= int(self.limit):
+                self.cond.wait()
+            self.inflight += 1
+            self.peak_inflight = max(self.peak_inflight, self.inflight)
+            delay = 0.0
+            if self.interval:
+                now = time.monotonic()
+                slot = max(now, self._next_slot)
+                self._next_slot = slot + self.interval
+                delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        waited = time.perf_counter() - start
+        if waited > 0.001:
+            METRICS.add('throttled_seconds', waited)
+
+    def release(self, latency, overloaded):
+        """Kembalikan slot dan sesuaikan batas dari latency/error panggilan"""
+        with self.cond:
+            self.inflight -= 1
+            self.latency_ewma += LATENCY_SMOOTHING * (latency - self.latency_ewma)
+            now = time.monotonic()
+            if overloaded or latency > self.latency_target:
+                if now - self._last_decrease > max(latency, self.latency_ewma):
+                    self.limit = max(float(self.min_inflight), self.limit * DECREASE_FACTOR)
+                    self._last_decrease = now
+                    self.decreases += 1
+            else:
+                self.limit = min(float(self.max_inflight), self.limit + 1.0 / self.limit)
+            self.cond.notify_all()
+
+    def attach(self, stub):
+        """Bungkus stub pyVmomi: setiap InvokeMethod lewat acquire/release"""
+        if getattr(stub, '_vexport_scheduled', False):
+            return stub
+        invoke = stub.InvokeMethod
+
+        def scheduled_invoke(mo, info, args, *rest, **kwargs):
+            if info.wsdlName in UNSCHEDULED_METHODS:
+                return invoke(mo, info, args, *rest, **kwargs)
+            self.acquire()
+            start = time.perf_counter()
+            overloaded = False
             try:
-                dvs_name = config.distributedVirtualSwitch.name
-            except:
-                pass
-
-            data.append({
-                'name': dvpg.name,
-                'dvswitch': dvs_name,
-                'type': safe_get_property(config, 'type', 'N/A'),
-                'num_ports': safe_get_property(config, 'numPorts', 0),
-                'vlan_id': vlan_id,
-                'vlan_type': vlan_type,
-                'port_binding': safe_get_property(config, 'defaultPortConfig.portBindingType', 'N/A'),
-                'auto_expand': safe_get_property(config, 'autoExpand', False)
-            })
-        except Exception as e:
-            print(f"  ⚠ Error on distributed portgroup: {str(e)[:60]}")
-    write_csv('vPortgroup_DV.csv', data)
+                return invoke(mo, info, args, *rest, **kwargs)
+            except TRANSIENT_ERRORS:
+                overloaded = True
+                with self.cond:
+                    self.errors += 1
+                raise
+            finally:
+                self.release(time.perf_counter() - start, overloaded)
 
-def export_standard_vswitches(content):
-    """10. Export Standard vSwitches"""
-    print("Mengekspor Standard vSwitches...")
-    data = []
-    for host in get_all_objs(content, [vim.HostSystem]):
-        try:
-            if not host.config or not host.config.network or not host.config.network.vswitch:
-                continue
+        stub.InvokeMethod = scheduled_invoke
+        stub._vexport_scheduled = True
+        return stub
 
-            for vsw in host.config.network.vswitch:
-                try:
-                    pnic_list = ','.join(vsw.pnic) if vsw.pnic else ''
-                    data.append({
-                        'host': host.name,
-                        'name': vsw.name,
-                        'num_ports': vsw.spec.numPorts,
-                        'num_ports_available': vsw.numPortsAvailable,
-                        'mtu': vsw.mtu,
-                        'num_physical_nics': len(vsw.pnic) if vsw.pnic else 0,
-                        'physical_nics': pnic_list,
-                        'num_portgroups': len(vsw.portgroup) if vsw.portgroup else 0
-                    })
-                except:
-                    continue
-        except Exception as e:
-            print(f"  ⚠ Error processing vswitches for host: {str(e)[:60]}")
-    write_csv('vSwitch_Std.csv', data)
+    def report(self):
+        with self.cond:
+            return {
+                'limit': round(self.limit, 2),
+                'min_inflight': self.min_inflight,
+                'max_inflight': self.max_inflight,
+                'peak_inflight': self.peak_inflight,
+                'latency_ewma': round(self.latency_ewma, 4),
+                'decreases': self.decreases,
+                'errors': self.errors,
+                'max_rps': round(1.0 / self.interval, 2) if self.interval else 0,
+            }
 
-def export_vmkernel_nics(content):
-    """11. Export VMkernel NICs"""
-    print("Mengekspor VMkernel NICs...")
-    data = []
-    for host in get_all_objs(content, [vim.HostSystem]):
-        try:
-            if not host.config or not host.config.network or not host.config.network.vnic:
-                continue
+# Penjadwal proses ini; dikonfigurasi ulang dari command line (configure_run)
+SCHEDULER = RequestScheduler()
 
-            for vnic in host.config.network.vnic:
-                try:
-                    dvport_id = 'N/A'
-                    try:
-                        if hasattr(vnic.spec, 'distributedVirtualPort') and vnic.spec.distributedVirtualPort:
-                            dvport_id = vnic.spec.distributedVirtualPort.portKey
-                    except:
-                        pass
+# ============================================
+# DELTA EXPORT
+# ============================================
 
-                    data.append({
-                        'host': host.name,
-                        'device': vnic.device,
-                        'portgroup': vnic.portgroup,
-                        'dvport_id': dvport_id,
-                        'mac': safe_get_property(vnic, 'spec.mac', 'N/A'),
-                        'ip': safe_get_property(vnic, 'spec.ip.ipAddress', 'N/A'),
-                        'subnet_mask': safe_get_property(vnic, 'spec.ip.subnetMask', 'N/A'),
-                        'dhcp': safe_get_property(vnic, 'spec.ip.dhcp', False),
-                        'mtu': safe_get_property(vnic, 'spec.mtu', 1500)
-                    })
-                except:
-                    continue
-        except Exception as e:
-            print(f"  ⚠ Error processing vmkernel NICs for host: {str(e)[:60]}")
-    write_csv('vVMkernelNIC.csv', data)
+# Direktori default untuk state antar run (hash delta, dll.)
+STATE_DIR = '.vexport_state'
+# Tabel yang hanya berisi entri baru sejak run sebelumnya (high-water mark) atau sampel
+# time-series per run (vPerf); isinya sudah berupa delta sehingga tidak diberi file
+# _added/_changed/_removed
+APPEND_ONLY_TABLES = ('vEvent.csv', 'vTask.csv', 'vPerf.csv')
 
-def export_physical_nics(content):
-    """12. Export Physical NICs"""
-    print("Mengekspor Physical NICs...")
-    data = []
-    for host in get_all_objs(content, [vim.HostSystem]):
-        try:
-            if not host.config or not host.config.network or not host.config.network.pnic:
-                continue
+def _row_hash(row):
+    """Hash isi baris untuk mendeteksi perubahan antar run"""
+    payload = '\x1f'.join(str(value) for value in row)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=8).hexdigest()
 
-            for pnic in host.config.network.pnic:
-                try:
-                    speed = 'Down'
-                    duplex = 'N/A'
-                    if pnic.linkSpeed:
-                        speed = pnic.linkSpeed.speedMb
-                        duplex = pnic.linkSpeed.duplex
+class DeltaSink:
+    """Membandingkan baris dengan run sebelumnya dan menulis file delta
 
-                    vswitch_name = 'Not assigned'
-                    try:
-                        if host.config.network.vswitch:
-                            for vsw in host.config.network.vswitch:
-                                if vsw.pnic and pnic.key in vsw.pnic:
-                                    vswitch_name = vsw.name
-                                    break
-                    except:
-                        pass
+    Menghasilkan <tabel>_added.csv, <tabel>_changed.csv dan <tabel>_removed.csv
+    di samping file lengkap. State (kunci -> hash) disimpan di state_dir.
+    """
 
-                    data.append({
-                        'host': host.name,
-                        'device': pnic.device,
-                        'mac': pnic.mac,
-                        'pci': pnic.pci,
-                        'driver': pnic.driver,
-                        'link_speed_mb': speed,
-                        'duplex': duplex,
-                        'wol_supported': pnic.wakeOnLanSupported,
-                        'vswitch': vswitch_name
-                    })
-                except:
-                    continue
-        except Exception as e:
-            print(f"  ⚠ Error processing physical NICs for host: {str(e)[:60]}")
-    write_csv('vPNIC.csv', data)
+    def __init__(self, filename, state_dir=STATE_DIR):
+        self.filename = filename
+        schema = TABLE_SCHEMAS[filename]
+        self.fields = schema.fields
+        self.key_fields = schema.keys
+        self.key_index = [schema.fields.index(field) for field in schema.keys]
+        self.hash_index = [index for index, column in enumerate(schema.columns)
+                           if not column.volatile]
+        stem = os.path.splitext(filename)[0]
+        self.state_path = os.path.join(state_dir, f'{stem}.delta.json')
+        self.previous = self._load_state()
+        self.current = {}
+        self.added = CsvSink(f'{stem}_added.csv', self.fields, quiet=True)
+        self.changed = CsvSink(f'{stem}_changed.csv', self.fields, quiet=True)
+        self.removed = CsvSink(f'{stem}_removed.csv', self.key_fields, quiet=True)
 
-def export_hbas(content):
-    """13. Export HBAs"""
-    print("Mengekspor HBAs...")
-    data = []
-    for host in get_all_objs(content, [vim.HostSystem]):
+    def _load_state(self):
         try:
-            if not host.config or not host.config.storageDevice or not host.config.storageDevice.hostBusAdapter:
-                continue
+            with open(self.state_path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"  ⚠ State delta {self.state_path} tidak terbaca, dianggap run pertama: {e}")
+            return {}
+
+    def write(self, row):
+        key = json.dumps([str(row[index]) for index in self.key_index])
+        row_hash = _row_hash([row[index] for index in self.hash_index])
+        self.current[key] = row_hash
+        previous_hash = self.previous.get(key)
+        if previous_hash is None:
+            self.added.write(row)
+        elif previous_hash != row_hash:
+            self.changed.write(row)
+
+    def close(self):
+        for key in self.previous.keys() - self.current.keys():
+            self.removed.write(json.loads(key))
+        for sink in (self.added, self.changed, self.removed):
+            sink.close()
+        os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.current, f)
+        os.replace(tmp_path, self.state_path)
+        print(f"  Δ {self.filename}: +{self.added.count} ~{self.changed.count} "
+              f"-{self.removed.count}")
+
+    def abort(self):
+        """Exporter gagal: file delta ditutup tanpa 'removed' dan state lama dipertahankan"""
+        for sink in (self.added, self.changed, self.removed):
+            sink.close()
+        print(f"  ⚠ Delta {self.filename} tidak lengkap, state sebelumnya dipertahankan")
+
+# ============================================
+# CACHE KOLOM (render offline)
+# ============================================
 
-            for hba in host.config.storageDevice.hostBusAdapter:
+# Subdirektori state untuk cache kolom (--cache); satu file per tabel
+CACHE_DIR = 'cache'
+CACHE_SUFFIX = '.vcol'
+CACHE_MAGIC = b'VCOL1\n'
+# Penyimpanan kolom bertipe: array int64, float64 dan bool (1 byte)
+CACHE_TYPECODES = {int: 'q', float: 'd', bool: 'b'}
+CACHE_KIND_NAMES = {str: 'text', int: 'int', float: 'float', bool: 'bool'}
+# Typecode memoryview saat dibaca kembali (bool dibaca sebagai '?')
+CACHE_VIEW_FORMATS = {'int': 'q', 'float': 'd', 'bool': '?'}
+
+def _align(position, size=8):
+    return (position + size - 1) // size * size
+
+def _fits(kind, value):
+    """Nilai cocok untuk array bertipe kolom (bool bukan int; int boleh di kolom float)"""
+    if kind is bool:
+        return isinstance(value, bool)
+    if kind is int:
+        return isinstance(value, int) and not isinstance(value, bool)
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+class ColumnBuilder:
+    """Satu kolom cache: array bertipe, atau teks UTF-8 (blob + offset akhir per baris)
+
+    Kolom numerik yang berisi nilai lain (mis. default 'N/A') disimpan sebagai teks
+    agar render CSV menghasilkan teks yang sama persis. Int di kolom float (default 0,
+    total Counter) disimpan sebagai float agar kolom tetap bisa dibandingkan numerik.
+    """
+
+    def __init__(self, kind):
+        self.kind = kind if kind in CACHE_TYPECODES else str
+        self.values = array(CACHE_TYPECODES[self.kind]) if self.kind is not str else None
+        self.blob = bytearray()
+        self.offsets = array('q', [0])
+
+    def append(self, value):
+        if self.kind is not str:
+            if _fits(self.kind, value):
                 try:
-                    hba_type = 'Unknown'
-                    wwn = 'N/A'
-                    speed = 'N/A'
-
-                    if isinstance(hba, vim.host.FibreChannelHba):
-                        hba_type = 'Fibre Channel'
-                        wwn = ':'.join([hba.portWorldWideName[i:i+2] for i in range(0, len(hba.portWorldWideName), 2)])
-                        speed = hba.speed if hasattr(hba, 'speed') else 'N/A'
-                    elif isinstance(hba, vim.host.InternetScsiHba):
-                        hba_type = 'iSCSI'
-                        wwn = hba.iScsiName if hasattr(hba, 'iScsiName') else 'N/A'
-                    elif isinstance(hba, vim.host.ParallelScsiHba):
-                        hba_type = 'Parallel SCSI'
-
-                    data.append({
-                        'host': host.name,
-                        'device': hba.device,
-                        'type': hba_type,
-                        'model': hba.model,
-                        'driver': hba.driver,
-                        'pci': hba.pci,
-                        'status': hba.status,
-                        'wwn_or_iqn': wwn,
-                        'speed': speed
-                    })
-                except:
-                    continue
-        except Exception as e:
-            print(f"  ⚠ Error processing HBAs for host: {str(e)[:60]}")
-    write_csv('vHBA.csv', data)
+                    self.values.append(float(value) if self.kind is float else value)
+                    return
+                except OverflowError:
+                    pass
+            self._to_text()
+        self.blob += str(value).encode('utf-8')
+        self.offsets.append(len(self.blob))
+
+    def _to_text(self):
+        kind, values = self.kind, self.values
+        self.kind, self.values = str, None
+        for value in values:
+            self.append(bool(value) if kind is bool else value)
+
+    def buffers(self):
+        """Segmen yang ditulis ke file: (nama, buffer)"""
+        if self.kind is str:
+            return [('data', self.blob), ('offsets', self.offsets)]
+        return [('data', self.values)]
+
+class ColumnarSink:
+    """Menyimpan satu tabel sebagai file kolom yang bisa di-mmap (lihat CachedTable)
+
+    Kolom dikumpulkan dalam array ringkas selama ekspor lalu ditulis sekali saat
+    tabel selesai (atomic), sehingga cache selalu berisi tabel lengkap.
+    """
+
+    def __init__(self, filename, state_dir=STATE_DIR):
+        schema = TABLE_SCHEMAS[filename]
+        self.filename = filename
+        self.fields = schema.fields
+        self.path = os.path.join(state_dir, CACHE_DIR, os.path.splitext(filename)[0] + CACHE_SUFFIX)
+        self.columns = [ColumnBuilder(column.kind) for column in schema.columns]
+        self.count = 0
+
+    def write(self, row):
+        for column, value in zip(self.columns, row):
+            column.append(value)
+        self.count += 1
+
+    def close(self):
+        entries, segments, position = [], [], 0
+        for field, column in zip(self.fields, self.columns):
+            entry = {'name': field, 'kind': CACHE_KIND_NAMES[column.kind]}
+            for part, buffer in column.buffers():
+                size = len(buffer) * getattr(buffer, 'itemsize', 1)
+                entry[part] = [position, size]
+                segments.append((position, buffer))
+                position = _align(position + size)
+            entries.append(entry)
+        header = json.dumps({
+            'table': self.filename,
+            'rows': self.count,
+            'vcenter': VCENTER_HOST,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'byteorder': sys.byteorder,
+            'columns': entries,
+        }).encode('utf-8')
+        data_start = _align(len(CACHE_MAGIC) + 8 + len(header))
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(CACHE_MAGIC + len(header).to_bytes(8, 'little') + header)
+            for offset, buffer in segments:
+                f.write(b'\0' * (data_start + offset - f.tell()))
+                f.write(buffer)
+        os.replace(tmp_path, self.path)
+
+    def abort(self):
+        """Exporter gagal: cache tabel dari run sebelumnya dipertahankan"""
+        print(f"  ⚠ Cache {self.filename} tidak diperbarui (ekspor tidak lengkap)")
+
+class TextColumn:
+    """Kolom teks dari cache: string didekode per baris saat diakses"""
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        return str(self.blob[self.offsets[index]:self.offsets[index + 1]], 'utf-8')
+
+    def release(self):
+        self.blob.release()
+        self.offsets.release()
+
+class CachedTable:
+    """Tabel dari cache kolom, dibaca lewat mmap tanpa menyalin data
+
+    column() mengembalikan memoryview langsung ke file untuk kolom numerik.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+        start = len(CACHE_MAGIC)
+        if bytes(buffer[:start]) != CACHE_MAGIC:
+            buffer.release()
+            self._mmap.close()
+            raise ValueError(f"{path} bukan file cache kolom")
+        size = int.from_bytes(buffer[start:start + 8], 'little')
+        header = json.loads(bytes(buffer[start + 8:start + 8 + size]))
+        if header['byteorder'] != sys.byteorder:
+            buffer.release()
+            self._mmap.close()
+            raise ValueError(f"{path} ditulis dengan byteorder {header['byteorder']}")
+        data_start = _align(start + 8 + size)
+        self.filename = header['table']
+        self.rows = header['rows']
+        self.vcenter = header['vcenter']
+        self.created = header['created']
+        self.fields = tuple(entry['name'] for entry in header['columns'])
+        self.kinds = {entry['name']: entry['kind'] for entry in header['columns']}
+        self._columns = {}
+
+        def segment(bounds):
+            offset, length = bounds
+            return buffer[data_start + offset:data_start + offset + length]
+
+        for entry in header['columns']:
+            if entry['kind'] == 'text':
+                column = TextColumn(segment(entry['data']), segment(entry['offsets']).cast('q'))
+            else:
+                column = segment(entry['data']).cast(CACHE_VIEW_FORMATS[entry['kind']])
+            self._columns[entry['name']] = column
+        buffer.release()
+
+    def column(self, name):
+        return self._columns[name]
+
+    def iter_rows(self, fields=None, predicate=None):
+        """Baris tuple (kolom fields, default semua) yang lolos predicate(index)"""
+        columns = [self._columns[field] for field in fields or self.fields]
+        for index in range(self.rows):
+            if predicate is None or predicate(index):
+                yield tuple(column[index] for column in columns)
+
+    def close(self):
+        for column in self._columns.values():
+            column.release()
+        self._columns.clear()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
 # ============================================
-# MAIN FUNCTION
+# RIWAYAT SQLITE
 # ============================================
 
-def main():
-    """Fungsi utama"""
-    print("="*60)
-    print("vCenter Data Exporter ke CSV")
-    print("="*60)
-    print(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+# Afinitas kolom SQLite per tipe kolom skema
+SQLITE_TYPES = {str: 'TEXT', int: 'INTEGER', float: 'REAL', bool: 'INTEGER'}
+# Kolom yang diberi index (bersama run_ts) bila ada di tabel, untuk query riwayat per objek
+SQLITE_INDEX_COLUMNS = ('name', 'vm_name', 'host', 'datastore')
+# Kolom waktu/umur yang diberi index (run_ts, kolom), untuk query rentang pada satu run
+# (mis. snapshot lebih dari 30 hari pada run terakhir)
+SQLITE_RANGE_INDEX_COLUMNS = ('create_time', 'age_days')
+# Batas tunggu lock database saat beberapa exporter/proses menulis bersamaan (detik)
+SQLITE_TIMEOUT = 60
 
-    try:
-        # Koneksi ke vCenter
-        si = connect_vcenter()
-        content = si.RetrieveContent()
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
 
-        # Export semua data
-        print("Memulai ekspor data...\n")
+def _sql_value(kind, value):
+    """Nilai kolom untuk SQLite; nilai yang tidak sesuai tipe (mis. 'N/A') disimpan sebagai teks"""
+    if kind is not str and _fits(kind, value):
+        return kind(value)
+    return str(value)
+
+def run_timestamp():
+    """Waktu mulai run, sama untuk semua tabel; run --resume memakai waktu run awal"""
+    if CHECKPOINT is not None:
+        return format_time(datetime.fromisoformat(CHECKPOINT.manifest['started']))
+    return format_time(datetime.fromtimestamp(METRICS.started))
+
+class SqliteSink:
+    """Menyimpan baris tabel ke database SQLite riwayat (satu tabel SQL per tabel CSV)
+
+    Setiap baris diberi run_ts dan vcenter; kunci utama (run_ts, vcenter, kolom kunci
+    tabel) sehingga setiap run tersimpan berdampingan. Baris dimasukkan per batch
+    dengan executemany, satu transaksi pendek per batch.
+    """
+
+    def __init__(self, filename, path, batch_size=CSV_BATCH_SIZE):
+        schema = TABLE_SCHEMAS[filename]
+        self.filename = filename
+        self.table = os.path.splitext(filename)[0]
+        self.kinds = [column.kind for column in schema.columns]
+        self.run = (run_timestamp(), VCENTER_HOST)
+        self.batch_size = batch_size
+        self.count = 0
+        self._buffer = []
+        self.db = sqlite3.connect(path, timeout=SQLITE_TIMEOUT)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self._prepare(schema)
+        columns = ', '.join(_quote(field) for field in ('run_ts', 'vcenter') + schema.fields)
+        placeholders = ', '.join('?' * (len(schema.fields) + 2))
+        self._insert = (f'INSERT OR REPLACE INTO {_quote(self.table)} ({columns}) '
+                        f'VALUES ({placeholders})')
+
+    def _prepare(self, schema):
+        """Buat tabel/index bila belum ada, tambah kolom baru, hapus baris run ini (diulang)"""
+        table = _quote(self.table)
+        columns = ''.join(f', {_quote(column.name)} {SQLITE_TYPES[column.kind]}'
+                          for column in schema.columns)
+        keys = ', '.join(_quote(field) for field in ('run_ts', 'vcenter') + schema.keys)
+        with self.db:
+            self.db.execute(f'CREATE TABLE IF NOT EXISTS {table} (run_ts TEXT NOT NULL, '
+                            f'vcenter TEXT NOT NULL{columns}, PRIMARY KEY ({keys}))')
+            existing = {row[1] for row in self.db.execute(f'PRAGMA table_info({table})')}
+            for column in schema.columns:
+                if column.name not in existing:
+                    self.db.execute(f'ALTER TABLE {table} ADD COLUMN '
+                                    f'{_quote(column.name)} {SQLITE_TYPES[column.kind]}')
+            for field in SQLITE_INDEX_COLUMNS:
+                if field in schema.fields:
+                    index = _quote(f'{self.table}_{field}')
+                    self.db.execute(f'CREATE INDEX IF NOT EXISTS {index} '
+                                    f'ON {table} ({_quote(field)}, run_ts)')
+            for field in SQLITE_RANGE_INDEX_COLUMNS:
+                if field in schema.fields:
+                    index = _quote(f'{self.table}_run_{field}')
+                    self.db.execute(f'CREATE INDEX IF NOT EXISTS {index} '
+                                    f'ON {table} (run_ts, {_quote(field)})')
+            self.db.execute('CREATE TABLE IF NOT EXISTS vexport_runs (run_ts TEXT NOT NULL, '
+                            'vcenter TEXT NOT NULL, table_name TEXT NOT NULL, rows INTEGER, '
+                            'completed TEXT, PRIMARY KEY (run_ts, vcenter, table_name))')
+            self.db.execute(f'DELETE FROM {table} WHERE run_ts = ? AND vcenter = ?', self.run)
+
+    def write(self, row):
+        self._buffer.append(self.run + tuple(_sql_value(kind, value)
+                                             for kind, value in zip(self.kinds, row)))
+        self.count += 1
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            with self.db:
+                self.db.executemany(self._insert, self._buffer)
+            self._buffer.clear()
+
+    def close(self):
+        self.flush()
+        with self.db:
+            self.db.execute('INSERT OR REPLACE INTO vexport_runs VALUES (?, ?, ?, ?, ?)',
+                            self.run + (self.table, self.count, format_time(datetime.now())))
+        self.db.close()
+
+    def abort(self):
+        """Exporter gagal: baris tabel run ini dihapus agar riwayat tidak berisi data setengah"""
+        self._buffer.clear()
+        with self.db:
+            self.db.execute(f'DELETE FROM {_quote(self.table)} WHERE run_ts = ? AND vcenter = ?',
+                            self.run)
+        self.db.close()
+        print(f"  ⚠ Riwayat SQLite {self.filename} run ini tidak disimpan (ekspor tidak lengkap)")
+
+# ============================================
+# CHECKPOINT & RETRY
+# ============================================
+
+# Subdirektori state untuk checkpoint --resume
+CHECKPOINT_DIR = 'checkpoint'
+# Percobaan ulang error sementara: jeda RETRY_BASE_DELAY, 2x, 4x, ... (maks RETRY_MAX_DELAY)
+RETRY_ATTEMPTS = 5
+RETRY_BASE_DELAY = 2
+RETRY_MAX_DELAY = 60
+# Error jaringan/SOAP yang dianggap sementara. Sengaja bukan OSError umum: error lokal
+# (file, izin, sertifikat SSL) tidak diulang dan tidak dianggap vCenter kelebihan beban
+TRANSIENT_ERRORS = (
+    ConnectionError,
+    socket.timeout,
+    http.client.HTTPException,
+    vmodl.fault.HostCommunication,
+    vmodl.fault.SystemError,
+)
+
+def backoff(attempt, error, description):
+    """Tunggu sebelum percobaan ke-(attempt + 1): exponential backoff dengan jitter"""
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1))
+    delay *= random.uniform(0.5, 1.0)
+    print(f"  ↻ {description} gagal ({type(error).__name__}: {str(error)[:80]}), "
+          f"dicoba lagi dalam {delay:.1f} detik ({attempt}/{RETRY_ATTEMPTS - 1})")
+    METRICS.add('retries')
+    time.sleep(delay)
+
+def with_retry(description, func, *args, **kwargs):
+    """Jalankan func; error di TRANSIENT_ERRORS dicoba ulang sampai RETRY_ATTEMPTS kali
+
+    Hanya untuk operasi yang aman diulang (login, retrieval lengkap satu tipe).
+    """
+    for attempt in range(1, RETRY_ATTEMPTS + 1):
+        try:
+            return func(*args, **kwargs)
+        except TRANSIENT_ERRORS as e:
+            if attempt == RETRY_ATTEMPTS:
+                raise
+            backoff(attempt, e, description)
+
+class TableProgress:
+    """Moref yang barisnya sudah aman tertulis di CSV satu tabel
 
-        export_vcenter_info(content)
-        export_clusters(content)
-        export_hosts(content)
-        export_datastores(content)
-        export_vms(content)
-        export_disks(content)
-        export_snapshots(content)
-        export_standard_portgroups(content)
-        export_distributed_portgroups(content)
-        export_standard_vswitches(content)
-        export_vmkernel_nics(content)
-        export_physical_nics(content)
-        export_hbas(content)
+    Setiap flush CsvSink (selalu di batas objek) mencatat satu baris JSON berisi
+    offset file dan moref yang selesai sejak flush sebelumnya. --resume memotong
+    CSV ke offset terakhir lalu melewati moref yang sudah tercatat.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.done = set()
+        self.offset = None
+        self.sink = None
+        self._pending = []
+        if resume:
+            self._load()
+        self._file = open(path, 'a' if resume else 'w', encoding='utf-8')
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        batch = json.loads(line)
+                    except ValueError:
+                        break  # baris terakhir terpotong saat run sebelumnya berhenti
+                    self.offset = batch['offset']
+                    self.done.update(batch['objects'])
+        except FileNotFoundError:
+            pass
+
+    def skip(self, moid):
+        return moid in self.done
+
+    def completed(self, moid):
+        """Semua baris objek ini sudah diserahkan ke sink; flush jika batch penuh"""
+        self._pending.append(moid)
+        if self.sink is not None and self.sink.buffered >= self.sink.batch_size:
+            self.sink.flush()
+
+    def commit(self, offset):
+        self._file.write(json.dumps({'offset': offset, 'objects': self._pending}) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.done.update(self._pending)
+        self._pending = []
+        self.offset = offset
+
+    def close(self):
+        self._file.close()
+
+class ExportCheckpoint:
+    """Manifest checkpoint per tabel untuk --resume
+
+    <state_dir>/checkpoint/manifest.json menyimpan status tiap tabel (done/partial);
+    <tabel>.progress menyimpan progress objek per batch (lihat TableProgress).
+    """
+
+    def __init__(self, state_dir, resume=False):
+        self.directory = os.path.join(state_dir, CHECKPOINT_DIR)
+        self.path = os.path.join(self.directory, 'manifest.json')
+        self.lock = threading.Lock()
+        self.manifest = self._load() if resume else None
+        self.resume = self.manifest is not None
+        if self.manifest is None:
+            self._clear()
+            self.manifest = {
+                'vcenter': VCENTER_HOST,
+                'started': datetime.now().isoformat(timespec='seconds'),
+                'completed': False,
+                'tables': {},
+            }
+        self._save()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            print("ℹ Tidak ada checkpoint, ekspor dimulai dari awal")
+            return None
+        except (OSError, ValueError) as e:
+            print(f"⚠ Checkpoint {self.path} tidak terbaca, ekspor dimulai dari awal: {e}")
+            return None
+        if manifest.get('vcenter') != VCENTER_HOST:
+            print(f"⚠ Checkpoint milik vCenter {manifest.get('vcenter')}, ekspor dimulai dari awal")
+            return None
+        if manifest.get('completed'):
+            print("ℹ Run sebelumnya sudah selesai, ekspor dimulai dari awal")
+            return None
+        print(f"↻ Melanjutkan run {manifest.get('started')} dari checkpoint")
+        return manifest
+
+    def _clear(self):
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                os.remove(os.path.join(self.directory, name))
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def status(self, filename):
+        return self.manifest['tables'].get(filename)
+
+    def pending(self, exporters):
+        """Exporter yang tabelnya belum selesai"""
+        return [entry for entry in exporters if self.status(entry[1]) != 'done']
+
+    def open_progress(self, filename, resume=True):
+        """TableProgress tabel; dilanjutkan hanya jika tabel sebelumnya setengah jadi"""
+        stem = os.path.splitext(filename)[0]
+        resume = (resume and self.resume and self.status(filename) == 'partial'
+                  and os.path.exists(filename))
+        self.mark(filename, 'partial')
+        return TableProgress(os.path.join(self.directory, f'{stem}.progress'), resume)
+
+    def mark(self, filename, status):
+        with self.lock:
+            self.manifest['tables'][filename] = status
+            self._save()
+
+    def finish(self):
+        """Run selesai: --resume berikutnya memulai ekspor baru"""
+        with self.lock:
+            self.manifest['completed'] = True
+            self._save()
+
+# Checkpoint run export yang sedang berjalan (diisi run_export)
+CHECKPOINT = None
+
+# ============================================
+# PROPERTY COLLECTOR (BULK RETRIEVAL)
+# ============================================
+
+# Property path yang dibutuhkan tiap exporter. Semua path diambil sekaligus
+# lewat PropertyCollector, exporter cukup membaca hasilnya secara lokal.
+PROPERTY_PLANS = {
+    'cluster': (vim.ClusterComputeResource, [
+        'name', 'overallStatus',
+        'summary.numCpuCores', 'summary.numCpuThreads', 'summary.totalMemory',
+        'summary.numHosts', 'summary.numEffectiveHosts',
+        'configuration.drsConfig.enabled', 'configuration.drsConfig.defaultVmBehavior',
+        'configuration.dasConfig.enabled',
+    ]),
+    'host': (vim.HostSystem, [
+        'name', 'overallStatus',
+        'hardware.systemInfo.vendor', 'hardware.systemInfo.model', 'summary.hardware.cpuModel',
+        'hardware.cpuInfo.numCpuCores', 'hardware.cpuInfo.numCpuThreads', 'hardware.cpuInfo.hz',
+        'hardware.memorySize', 'summary.hardware.numNics',
+        'runtime.connectionState', 'runtime.powerState', 'runtime.inMaintenanceMode',
+        'config.product.version', 'config.product.build', 'parent',
+    ]),
+    'datastore': (vim.Datastore, [
+        'name', 'summary.type', 'summary.capacity', 'summary.freeSpace',
+        'summary.accessible', 'summary.multipleHostAccess', 'summary.maintenanceMode',
+        'summary.uncommitted', 'vm',
+    ]),
+    'vm': (vim.VirtualMachine, [
+        'name', 'overallStatus', 'config.template',
+        'summary.config.numVirtualDisks', 'summary.config.numEthernetCards',
+        'config.hardware.numCPU', 'config.hardware.numCoresPerSocket', 'config.hardware.memoryMB',
+        'config.guestFullName', 'config.guestId', 'config.version', 'config.annotation',
+        'guest.toolsStatus', 'guest.toolsVersion', 'runtime.powerState', 'runtime.host',
+    ]),
+    'disk': (vim.VirtualMachine, ['name', 'config.template', 'config.hardware.device']),
+    'snapshot': (vim.VirtualMachine, [
+        'name', 'snapshot.rootSnapshotList', 'snapshot.currentSnapshot',
+        'layoutEx.file', 'layoutEx.disk', 'layoutEx.snapshot',
+    ]),
+    'portgroup_std': (vim.HostSystem, ['name', 'config.network.portgroup']),
+    'portgroup_dv': (vim.dvs.DistributedVirtualPortgroup, [
+        'name', 'config.type', 'config.numPorts', 'config.autoExpand',
+        'config.defaultPortConfig', 'config.distributedVirtualSwitch',
+    ]),
+    'vswitch_std': (vim.HostSystem, ['name', 'config.network.vswitch']),
+    'vmknic': (vim.HostSystem, ['name', 'config.network.vnic']),
+    'pnic': (vim.HostSystem, ['name', 'config.network.pnic', 'config.network.vswitch']),
+    'hba': (vim.HostSystem, ['name', 'config.storageDevice.hostBusAdapter']),
+    'perf_host': (vim.HostSystem, ['name', 'runtime.connectionState']),
+    'perf_vm': (vim.VirtualMachine, ['name', 'runtime.powerState']),
+    'custom_attr': (vim.VirtualMachine, ['name', 'config.template', 'customValue']),
+    'guest_net': (vim.VirtualMachine, ['name', 'config.template', 'guest.net']),
+}
+
+# Exporter yang membaca lebih dari satu plan: key --only -> nama plan
+PLAN_GROUPS = {
+    'perf': ('perf_host', 'perf_vm'),
+}
+
+# Tipe objek yang namanya di-resolve setiap plan lewat indeks moref -> nama;
+# hanya diambil (property 'name' saja) bila plan yang membutuhkannya dipilih
+PLAN_NAME_REFERENCES = {
+    'host': (vim.ClusterComputeResource,),
+    'vm': (vim.HostSystem,),
+    'disk': (vim.Datastore,),
+    'portgroup_dv': (vim.DistributedVirtualSwitch,),
+}
+
+class ObjectRecord:
+    """Property satu managed object hasil PropertyCollector (data lokal)"""
+    __slots__ = ('obj', 'props')
+
+    def __init__(self, obj, props):
+        self.obj = obj
+        self.props = props
+
+    @property
+    def moid(self):
+        return self.obj._moId
+
+    @property
+    def name(self):
+        return self.props.get('name', 'N/A')
+
+    def get(self, path, default=None):
+        """Ambil property path; sisa path di bawah property yang sudah di-fetch ditelusuri lokal
+
+        Property kosong menghasilkan default (None: default kolom dari skema tabel).
+        """
+        if path in self.props:
+            value = self.props[path]
+            return value if value is not None else default
+        parts = path.split('.')
+        for i in range(len(parts) - 1, 0, -1):
+            prefix = '.'.join(parts[:i])
+            if prefix in self.props:
+                return safe_get_property(self.props[prefix], '.'.join(parts[i:]), default)
+        return default
+
+def _to_record(object_content):
+    """Konversi ObjectContent ke ObjectRecord, None jika objek sudah dihapus"""
+    for missing in object_content.missingSet or []:
+        if isinstance(missing.fault, vmodl.fault.ManagedObjectNotFound):
+            print("  ⚠ Skipping deleted/incomplete object")
+            METRICS.add('skipped_objects')
+            return None
+    props = {prop.name: prop.val for prop in object_content.propSet or []}
+    return ObjectRecord(object_content.obj, props)
+
+def _view_object_spec(content, root, vimtype):
+    """ObjectSpec lewat ContainerView rekursif di root; mengembalikan (spec, container)"""
+    pc_types = vmodl.query.PropertyCollector
+    container = content.viewManager.CreateContainerView(root, [vimtype], True)
+    traversal = pc_types.TraversalSpec(
+        name='traverseView', path='view', skip=False, type=vim.view.ContainerView
+    )
+    return pc_types.ObjectSpec(obj=container, skip=True, selectSet=[traversal]), container
+
+class InventoryScope:
+    """Akar pencarian objek hasil --datacenter/--cluster/--folder
+
+    Objek dicari lewat ContainerView yang berakar di setiap entitas terpilih,
+    sehingga penyaringan terjadi di sisi vCenter.
+    """
+
+    def __init__(self, roots, datacenters=None):
+        self.roots = roots
+        # moref akar -> datacenter pemiliknya (untuk tipe di luar subtree cluster)
+        self.datacenters = datacenters or {}
+
+    @classmethod
+    def resolve(cls, content, datacenters=None, clusters=None, folders=None):
+        """Cari entitas yang namanya cocok dengan pola glob; None jika tanpa scope"""
+        if not (datacenters or clusters or folders):
+            return None
+        scope = None
+        if datacenters:
+            scope = cls(_match_names(content, vim.Datacenter, datacenters))
+        roots = []
+        if clusters:
+            roots += _match_names(content, vim.ClusterComputeResource, clusters, scope)
+        if folders:
+            roots += _match_names(content, vim.Folder, folders, scope)
+        if not (clusters or folders):
+            roots = scope.roots
+        if not roots:
+            raise ValueError("Scope --datacenter/--cluster/--folder tidak cocok dengan "
+                             "objek apa pun")
+        owners = {root._moId: _owning_datacenter(root) for root in roots
+                  if isinstance(root, vim.ComputeResource)}
+        return cls(roots, owners)
+
+    def describe(self):
+        return ', '.join(f'{type(root).__name__} {root._moId}' for root in self.roots)
+
+    def split(self):
+        """Satu scope per akar, untuk shard paralel (mis. per cluster)"""
+        return [InventoryScope([root], self.datacenters) for root in self.roots]
+
+    def object_specs(self, content, vimtype):
+        """ObjectSpec untuk vimtype di semua akar; mengembalikan (object_set, containers)"""
+        pc_types = vmodl.query.PropertyCollector
+        object_set = []
+        containers = []
+        viewed = set()
+        for root in self.roots:
+            if isinstance(root, vimtype):
+                object_set.append(pc_types.ObjectSpec(obj=root, skip=False))
+            if (isinstance(root, vim.ComputeResource)
+                    and issubclass(vimtype, (vim.Datastore, vim.Network))):
+                # Datastore dan network tidak berada di bawah cluster: ikuti referensinya
+                path = 'datastore' if issubclass(vimtype, vim.Datastore) else 'network'
+                traversal = pc_types.TraversalSpec(
+                    name=f'traverse_{path}', path=path, skip=False, type=vim.ComputeResource
+                )
+                object_set.append(pc_types.ObjectSpec(obj=root, skip=True, selectSet=[traversal]))
+                continue
+            if (isinstance(root, vim.ComputeResource)
+                    and issubclass(vimtype, vim.DistributedVirtualSwitch)):
+                root = self.datacenters.get(root._moId)
+                if root is None or root._moId in viewed:
+                    continue
+            viewed.add(root._moId)
+            object_spec, container = _view_object_spec(content, root, vimtype)
+            object_set.append(object_spec)
+            containers.append(container)
+        return object_set, containers
+
+def _match_names(content, vimtype, patterns, scope=None):
+    """Objek bertipe vimtype yang namanya cocok dengan salah satu pola glob"""
+    matches = []
+    for record in iter_properties(content, vimtype, ['name'], scope=scope):
+        if any(fnmatch.fnmatchcase(record.name, pattern) for pattern in patterns):
+            matches.append(record.obj)
+    return matches
+
+def _owning_datacenter(entity):
+    """Datacenter tempat entity berada (mengikuti parent), None jika tidak ada"""
+    while entity is not None and not isinstance(entity, vim.Datacenter):
+        entity = entity.parent
+    return entity
+
+def build_filter_spec(content, vimtype, path_set, objects=None, scope=None):
+    """FilterSpec untuk property path sebuah tipe objek
+
+    Tanpa objects, objek dicari lewat ContainerView rekursif dari rootFolder, atau
+    dari akar-akar scope. Mengembalikan (filter_spec, containers); containers harus
+    di-Destroy pemanggil.
+    """
+    pc_types = vmodl.query.PropertyCollector
+    containers = []
+    if objects is not None:
+        object_set = [pc_types.ObjectSpec(obj=obj, skip=False) for obj in objects]
+    elif scope is not None:
+        object_set, containers = scope.object_specs(content, vimtype)
+    else:
+        object_spec, container = _view_object_spec(content, content.rootFolder, vimtype)
+        object_set = [object_spec]
+        containers = [container]
+    filter_spec = pc_types.FilterSpec(
+        objectSet=object_set,
+        propSet=[pc_types.PropertySpec(type=vimtype, all=False, pathSet=list(path_set))]
+    )
+    return filter_spec, containers
+
+def iter_properties(content, vimtype, path_set, objects=None, page_size=None, scope=None):
+    """Generator record per halaman (maxObjects) via RetrievePropertiesEx + continuation token
+
+    Jika objects diberikan, hanya objek tersebut yang diambil (dipakai untuk shard).
+    """
+    pc_types = vmodl.query.PropertyCollector
+    filter_spec, containers = build_filter_spec(content, vimtype, path_set, objects, scope)
+    if not filter_spec.objectSet:
+        # Scope tidak mencakup tipe ini (mis. DVS tanpa datacenter)
+        return
+    try:
+        collector = content.propertyCollector
+        options = pc_types.RetrieveOptions(maxObjects=page_size or DEFAULT_PAGE_SIZE)
+        token = None
+        result = collector.RetrievePropertiesEx([filter_spec], options)
+        while result:
+            token = result.token
+            for object_content in result.objects:
+                record = _to_record(object_content)
+                if record is not None:
+                    yield record
+            if not token:
+                break
+            result = collector.ContinueRetrievePropertiesEx(token)
+            token = None
+    finally:
+        # Generator dihentikan di tengah jalan: lepaskan hasil yang tersisa di server
+        if token:
+            collector.CancelRetrievePropertiesEx(token)
+        for container in containers:
+            container.Destroy()
+
+def retrieve_properties(content, vimtype, path_set, objects=None, page_size=None, scope=None):
+    """Mengambil property path untuk semua objek bertipe tertentu sebagai list"""
+    return list(iter_properties(content, vimtype, path_set, objects, page_size, scope))
+
+class PooledSession:
+    """Satu session vCenter di dalam SessionPool"""
+
+    def __init__(self, si):
+        self.si = si
+        self.content = si.RetrieveContent()
+        self.lock = threading.Lock()
+
+class SessionPool:
+    """Pool session vCenter terautentikasi untuk mode paralel"""
+
+    def __init__(self, size):
+        self.size = max(1, size)
+        self.sessions = [PooledSession(connect_vcenter(register_exit=False, slot=slot))
+                         for slot in range(self.size)]
+        self._idle = queue.Queue()
+        for session in self.sessions:
+            self._idle.put(session)
+
+    @property
+    def content(self):
+        return self.sessions[0].content
+
+    @contextmanager
+    def session(self):
+        """Pinjam satu session; session dikunci selama dipakai"""
+        session = self._idle.get()
+        try:
+            with session.lock:
+                yield session.content
+        finally:
+            self._idle.put(session)
+
+    def close(self):
+        """Disconnect semua session di pool"""
+        while self.sessions:
+            session = self.sessions.pop()
+            with session.lock:
+                try:
+                    disconnect_vcenter(session.si)
+                except Exception as e:
+                    print(f"  ⚠ Gagal disconnect session: {e}")
+
+def _split(items, parts):
+    """Bagi list menjadi beberapa shard dengan ukuran hampir sama"""
+    size = -(-len(items) // parts)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+class InventorySnapshot:
+    """Snapshot inventori: setiap tipe managed object diambil sekali per run
+
+    Pada mode stream, tipe di STREAMED_TYPES tidak disimpan; record-nya diambil
+    per halaman saat exporter membacanya sehingga memori tetap datar.
+    """
+
+    def __init__(self, content, plans=None, page_size=None, stream=False, scope=None):
+        self.content = content
+        self.about = content.about
+        self.plans = plans if plans is not None else PROPERTY_PLANS
+        self.page_size = page_size
+        self.stream = stream
+        self.scope = scope
+        self.pool = None
+        self.taken_at = None
+        self.names = {}
+        self.lock = threading.RLock()
+        self._records = {}
+
+    def property_paths(self):
+        """Gabungan property path plan terpilih, dikelompokkan per tipe objek"""
+        paths = {}
+        for plan_name, (vimtype, path_set) in self.plans.items():
+            for reference_type in PLAN_NAME_REFERENCES.get(plan_name, ()):
+                paths.setdefault(reference_type, set()).add('name')
+            if self._is_streamed(vimtype):
+                continue
+            paths.setdefault(vimtype, set()).update(path_set)
+        return paths
+
+    def _is_streamed(self, vimtype):
+        return self.stream and vimtype in STREAMED_TYPES
+
+    def collect(self, pool=None, workers=1):
+        """Ambil semua tipe objek sekaligus (satu ContainerView per tipe)"""
+        print("Mengambil inventori vCenter...")
+        self.taken_at = datetime.now()
+        self.pool = pool
+        if pool is None or workers <= 1:
+            for vimtype, path_set in self.property_paths().items():
+                records = with_retry(f"Ambil {vimtype.__name__}", retrieve_properties,
+                                     self.content, vimtype, sorted(path_set),
+                                     page_size=self.page_size, scope=self.scope)
+                self._store(vimtype, records)
+        else:
+            self._collect_parallel(pool, workers)
+        streamed = {vimtype for vimtype, _ in self.plans.values() if self._is_streamed(vimtype)}
+        for vimtype in streamed:
+            print(f"  ↻ {vimtype.__name__} (diambil per halaman saat ekspor)")
+        print()
+        return self
+
+    def _collect_parallel(self, pool, workers):
+        """Ambil semua tipe secara paralel
+
+        Scope dengan beberapa akar dibagi per akar (mis. per cluster); tanpa itu
+        tipe besar dibagi per shard objek.
+        """
+        def fetch(vimtype, path_set, objects=None, scope=self.scope):
+            with pool.session() as content, METRICS.scope('collect', timed=False):
+                return with_retry(f"Ambil {vimtype.__name__}", retrieve_properties,
+                                  content, vimtype, path_set, objects, self.page_size, scope)
+
+        paths = {vimtype: sorted(path_set) for vimtype, path_set in self.property_paths().items()}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            shards = []
+            if self.scope is not None and len(self.scope.roots) > 1:
+                for part in self.scope.split():
+                    shards.extend((vimtype, executor.submit(fetch, vimtype, path_set, None, part))
+                                  for vimtype, path_set in paths.items())
+            else:
+                # Tahap 1: daftar moref per tipe (tanpa property, sangat ringan)
+                listings = {vimtype: executor.submit(fetch, vimtype, [])
+                            for vimtype in paths}
+                for vimtype, listing in listings.items():
+                    objects = [record.obj for record in listing.result()]
+                    if len(objects) > SHARD_MIN_OBJECTS:
+                        chunks = _split(objects, workers)
+                    else:
+                        chunks = [objects] if objects else []
+                    for chunk in chunks:
+                        shards.append((vimtype, executor.submit(fetch, vimtype, paths[vimtype],
+                                                                chunk)))
+            # Tahap 2: gabungkan hasil shard per tipe
+            results = {vimtype: [] for vimtype in paths}
+            for vimtype, future in shards:
+                results[vimtype].extend(future.result())
+        for vimtype, records in results.items():
+            self._store(vimtype, records)
+
+    def _store(self, vimtype, records):
+        # Akar scope yang bertumpuk bisa mengembalikan objek yang sama lebih dari sekali
+        self._records[vimtype] = {record.moid: record for record in records}
+        if vimtype in NAME_INDEX_TYPES:
+            self.names.update((record.moid, record.name) for record in records)
+        print(f"  ✓ {vimtype.__name__} ({len(self._records[vimtype])} objek)")
+
+    def apply_update(self, vimtype, object_update):
+        """Terapkan satu ObjectUpdate dari WaitForUpdatesEx ke snapshot"""
+        moid = object_update.obj._moId
+        with self.lock:
+            records = self._records.setdefault(vimtype, {})
+            if object_update.kind == 'leave':
+                records.pop(moid, None)
+                if vimtype in NAME_INDEX_TYPES:
+                    self.names.pop(moid, None)
+                return
+            record = records.get(moid)
+            if record is None or object_update.kind == 'enter':
+                record = ObjectRecord(object_update.obj, {})
+                records[moid] = record
+            for change in object_update.changeSet or []:
+                if change.op in ('remove', 'indirectRemove'):
+                    record.props.pop(change.name, None)
+                else:
+                    record.props[change.name] = change.val
+            if vimtype in NAME_INDEX_TYPES:
+                self.names[moid] = record.name
+
+    def count(self, vimtype):
+        with self.lock:
+            return len(self._records.get(vimtype, {}))
+
+    def name_of(self, ref, default='N/A'):
+        """Nama objek dari indeks moref -> nama (tanpa round trip)"""
+        if ref is None:
+            return default
+        return self.names.get(ref if isinstance(ref, str) else ref._moId, default)
+
+    @contextmanager
+    def session(self):
+        """Content vCenter untuk panggilan API exporter (session pool bila paralel)"""
+        if self.pool is None:
+            yield self.content
+        else:
+            with self.pool.session() as content:
+                yield content
+
+    def batches(self, plan_name, size):
+        """Seperti records(), tetapi per list berisi maksimal size record
+
+        Checkpoint mencatat satu batch selesai setelah exporter meminta batch berikutnya.
+        """
+        progress = getattr(_table_capture, 'progress', None)
+        batch = []
+        for record in self._source(plan_name):
+            if progress is not None and progress.skip(record.moid):
+                continue
+            batch.append(record)
+            if len(batch) >= size:
+                yield batch
+                self._completed(progress, batch)
+                batch = []
+        if batch:
+            yield batch
+            self._completed(progress, batch)
+
+    @staticmethod
+    def _completed(progress, batch):
+        if progress is not None:
+            for record in batch:
+                progress.completed(record.moid)
+
+    def records(self, plan_name):
+        """Generator record untuk exporter tertentu
+
+        Dengan checkpoint aktif, objek yang sudah tertulis di run sebelumnya dilewati
+        dan setiap objek dicatat selesai setelah exporter memprosesnya.
+        """
+        yield from checkpointed(self._source(plan_name), lambda record: record.moid)
+
+    def _source(self, plan_name):
+        vimtype, path_set = self.plans[plan_name]
+        if not self._is_streamed(vimtype):
+            # Dibaca dari snapshot tanpa round trip; disalin agar aman dari update daemon
+            with self.lock:
+                records = list(self._records.get(vimtype, {}).values())
+            yield from records
+        elif self.pool is not None:
+            with self.pool.session() as content:
+                yield from self._stream(content, vimtype, path_set)
+        else:
+            yield from self._stream(self.content, vimtype, path_set)
+
+    def _stream(self, content, vimtype, path_set):
+        """Record per halaman; putus koneksi diulang dari awal tanpa mengulang objek"""
+        seen = set()
+        for attempt in range(1, RETRY_ATTEMPTS + 1):
+            try:
+                for record in iter_properties(content, vimtype, path_set,
+                                              page_size=self.page_size, scope=self.scope):
+                    if record.moid not in seen:
+                        seen.add(record.moid)
+                        yield record
+                return
+            except TRANSIENT_ERRORS as e:
+                if attempt == RETRY_ATTEMPTS:
+                    raise
+                backoff(attempt, e, f"Ambil {vimtype.__name__}")
+
+# ============================================
+# FUNGSI EKSPOR DATA
+# ============================================
+
+def export_vcenter_info(inventory):
+    """1. Export vCenter Info"""
+    print("Mengekspor vCenter Info...")
+    try:
+        data = [{
+            'name': inventory.about.name,
+            'version': inventory.about.version,
+            'build': inventory.about.build,
+            'os_type': inventory.about.osType,
+            'api_type': inventory.about.apiType,
+            'instance_uuid': inventory.about.instanceUuid
+        }]
+        write_csv('vInfo.csv', data)
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+
+def export_clusters(inventory):
+    """2. Export Clusters"""
+    print("Mengekspor Clusters...")
+    with open_table('vCluster.csv') as sink:
+        for cluster in inventory.records('cluster'):
+            try:
+                sink.write(
+                    name=cluster.name,
+                    total_cpu_cores=cluster.get('summary.numCpuCores'),
+                    total_cpu_threads=cluster.get('summary.numCpuThreads'),
+                    total_memory_gb=cluster.get('summary.totalMemory'),
+                    num_hosts=cluster.get('summary.numHosts'),
+                    num_effective_hosts=cluster.get('summary.numEffectiveHosts'),
+                    drs_enabled=cluster.get('configuration.drsConfig.enabled'),
+                    drs_behavior=cluster.get('configuration.drsConfig.defaultVmBehavior'),
+                    ha_enabled=cluster.get('configuration.dasConfig.enabled'),
+                    overall_status=cluster.get('overallStatus'),
+                    moref=cluster.moid
+                )
+            except Exception as e:
+                print(f"  ⚠ Error pada cluster {cluster.name}: {e}")
+
+def export_hosts(inventory):
+    """3. Export Hosts"""
+    print("Mengekspor Hosts...")
+    with open_table('vHost.csv') as sink:
+        for host in inventory.records('host'):
+            try:
+                # Host standalone (bukan anggota cluster) punya parent ComputeResource biasa
+                parent = host.get('parent')
+                if not isinstance(parent, vim.ClusterComputeResource):
+                    parent = None
+                sink.write(
+                    name=host.name,
+                    manufacturer=host.get('hardware.systemInfo.vendor'),
+                    model=host.get('hardware.systemInfo.model'),
+                    cpu_model=host.get('summary.hardware.cpuModel'),
+                    cpu_cores=host.get('hardware.cpuInfo.numCpuCores'),
+                    cpu_threads=host.get('hardware.cpuInfo.numCpuThreads'),
+                    cpu_mhz=host.get('hardware.cpuInfo.hz'),
+                    memory_gb=host.get('hardware.memorySize'),
+                    num_nics=host.get('summary.hardware.numNics'),
+                    connection_state=host.get('runtime.connectionState'),
+                    power_state=host.get('runtime.powerState'),
+                    maintenance_mode=host.get('runtime.inMaintenanceMode'),
+                    version=host.get('config.product.version'),
+                    build=host.get('config.product.build'),
+                    overall_status=host.get('overallStatus'),
+                    moref=host.moid,
+                    cluster=inventory.name_of(parent),
+                    cluster_moref=moref_id(parent)
+                )
+            except Exception as e:
+                print(f"  ⚠ Error pada host: {e}")
+
+def export_datastores(inventory):
+    """4. Export Datastores"""
+    print("Mengekspor Datastores...")
+    with open_table('vDatastore.csv') as sink:
+        for ds in inventory.records('datastore'):
+            try:
+                capacity = ds.get('summary.capacity', 0)
+                used = capacity - ds.get('summary.freeSpace', 0)
+
+                sink.write(
+                    name=ds.name,
+                    type=ds.get('summary.type'),
+                    capacity_gb=capacity,
+                    free_gb=ds.get('summary.freeSpace'),
+                    used_gb=used,
+                    used_percent=used / capacity * 100 if capacity > 0 else 0,
+                    accessible=ds.get('summary.accessible'),
+                    multiple_host_access=ds.get('summary.multipleHostAccess'),
+                    maintenance_mode=ds.get('summary.maintenanceMode'),
+                    uncommitted_gb=ds.get('summary.uncommitted'),
+                    num_vms=len(ds.get('vm', [])),
+                    moref=ds.moid
+                )
+            except Exception as e:
+                print(f"  ⚠ Error pada datastore: {e}")
+
+def export_vms(inventory):
+    """5. Export VMs"""
+    print("Mengekspor VMs...")
+    skipped = 0
+
+    with open_table('vVM.csv') as sink:
+        for vm in inventory.records('vm'):
+            try:
+                # Skip templates
+                if vm.get('config.template', False):
+                    continue
+
+                host = vm.get('runtime.host')
+
+                sink.write(
+                    name=vm.name,
+                    power_state=vm.get('runtime.powerState'),
+                    num_cpu=vm.get('config.hardware.numCPU'),
+                    num_cores_per_socket=vm.get('config.hardware.numCoresPerSocket'),
+                    memory_mb=vm.get('config.hardware.memoryMB'),
+                    memory_gb=vm.get('config.hardware.memoryMB'),
+                    guest_os=vm.get('config.guestFullName'),
+                    guest_os_id=vm.get('config.guestId'),
+                    version=vm.get('config.version'),
+                    tools_status=vm.get('guest.toolsStatus'),
+                    tools_version=vm.get('guest.toolsVersion'),
+                    host=inventory.name_of(host),
+                    num_disks=vm.get('summary.config.numVirtualDisks'),
+                    num_nics=vm.get('summary.config.numEthernetCards'),
+                    overall_status=vm.get('overallStatus'),
+                    annotation=vm.get('config.annotation'),
+                    moref=vm.moid,
+                    host_moref=moref_id(host)
+                )
+            except Exception as e:
+                skipped += 1
+                print(f"  ⚠ Skipping VM due to error: {str(e)[:80]}")
+
+    if skipped > 0:
+        print(f"  ℹ Skipped {skipped} VMs due to errors")
+
+def export_disks(inventory):
+    """6. Export Virtual Disks"""
+    print("Mengekspor Virtual Disks...")
+    with open_table('vDisk.csv') as sink:
+        for vm in inventory.records('disk'):
+            try:
+                if vm.get('config.template', False):
+                    continue
+
+                for device in vm.get('config.hardware.device', []):
+                    try:
+                        if isinstance(device, vim.vm.device.VirtualDisk):
+                            datastore = getattr(device.backing, 'datastore', None)
+
+                            sink.write(
+                                vm_name=vm.name,
+                                label=safe_get_property(device, 'deviceInfo.label', None),
+                                capacity_gb=device.capacityInKB,
+                                capacity_mb=device.capacityInKB,
+                                disk_mode=safe_get_property(device, 'backing.diskMode', None),
+                                thin_provisioned=safe_get_property(
+                                    device, 'backing.thinProvisioned', None),
+                                disk_type=type(device.backing).__name__ if device.backing else None,
+                                datastore=inventory.name_of(datastore),
+                                controller=device.controllerKey,
+                                unit_number=device.unitNumber,
+                                vm_moref=vm.moid,
+                                device_key=device.key,
+                                datastore_moref=moref_id(datastore)
+                            )
+                    except:
+                        continue
+            except Exception as e:
+                print(f"  ⚠ Error processing disks for VM: {str(e)[:60]}")
+
+def _chain_files(disk_layouts):
+    """File key per disk dalam chain layoutEx: disk key -> set file key"""
+    return {disk.key: {key for unit in disk.chain or [] for key in unit.fileKey or []}
+            for disk in disk_layouts or []}
+
+def snapshot_usage(vm, roots):
+    """Ukuran file per snapshot dari layoutEx (byte): moref -> (delta disk, file state)
+
+    Delta snapshot S adalah unit chain milik keadaan sesudahnya (snapshot anak, atau
+    disk aktif bila S snapshot saat ini) yang tidak ada di chain S; file state adalah
+    .vmsn/.vmem milik S. Semua dihitung lokal dari property yang sudah diambil.
+    """
+    sizes = {info.key: info.size or 0 for info in vm.get('layoutEx.file', [])}
+    layouts = {moref_id(layout.key): layout for layout in vm.get('layoutEx.snapshot', [])}
+    chains = {moref: _chain_files(layout.disk) for moref, layout in layouts.items()}
+    current = moref_id(vm.get('snapshot.currentSnapshot'), None)
+    usage = {}
+    stack = list(roots)
+    while stack:
+        node = stack.pop()
+        children = node.childSnapshotList or []
+        stack.extend(children)
+        moref = moref_id(node.snapshot)
+        if moref not in layouts:
+            continue
+        successors = [chains[moref_id(child.snapshot)] for child in children
+                      if moref_id(child.snapshot) in chains]
+        if moref == current:
+            successors.append(_chain_files(vm.get('layoutEx.disk', [])))
+        own = chains[moref]
+        delta_keys = set()
+        for successor in successors:
+            for disk_key, files in successor.items():
+                # Disk yang ditambahkan setelah snapshot bukan delta snapshot ini
+                if disk_key in own:
+                    delta_keys |= files - own[disk_key]
+        layout = layouts[moref]
+        state_keys = {layout.dataKey, layout.memoryKey} - {None, -1}
+        usage[moref] = (sum(sizes.get(key, 0) for key in delta_keys),
+                        sum(sizes.get(key, 0) for key in state_keys))
+    return usage
+
+def export_snapshots(inventory):
+    """7. Export Snapshots (pohon snapshot ditelusuri iteratif, ukuran dari layoutEx)"""
+    print("Mengekspor Snapshots...")
+    now = datetime.now(timezone.utc)
+    with open_table('vSnapshot.csv') as sink:
+        for vm in inventory.records('snapshot'):
+            try:
+                roots = vm.get('snapshot.rootSnapshotList', [])
+                if not roots:
+                    continue
+                usage = snapshot_usage(vm, roots)
+                # Urutan pre-order seperti penelusuran rekursif: induk sebelum anak
+                stack = [(snapshot, None) for snapshot in reversed(roots)]
+                while stack:
+                    snapshot, parent_name = stack.pop()
+                    moref = moref_id(snapshot.snapshot)
+                    delta_size, state_size = usage.get(moref, (None, None))
+                    sink.write(
+                        vm_name=vm.name,
+                        snapshot_name=snapshot.name,
+                        description=snapshot.description,
+                        create_time=snapshot.createTime,
+                        state=snapshot.state,
+                        quiesced=snapshot.quiesced,
+                        parent_snapshot=parent_name,
+                        id=snapshot.id,
+                        vm_moref=vm.moid,
+                        snapshot_moref=moref,
+                        delta_size_mb=delta_size,
+                        state_size_mb=state_size,
+                        age_days=snapshot.createTime and (now - snapshot.createTime).days
+                    )
+                    stack.extend((child, snapshot.name)
+                                 for child in reversed(snapshot.childSnapshotList or []))
+            except Exception as e:
+                print(f"  ⚠ Error processing snapshots for VM {vm.name}: {str(e)[:60]}")
+
+def export_standard_portgroups(inventory):
+    """8. Export Standard Port Groups"""
+    print("Mengekspor Standard Port Groups...")
+    with open_table('vPortgroup_Std.csv') as sink:
+        for host in inventory.records('portgroup_std'):
+            try:
+                for pg in host.get('config.network.portgroup', []):
+                    try:
+                        num_active_nics = 0
+                        try:
+                            if pg.spec.policy.nicTeaming.nicOrder.activeNic:
+                                num_active_nics = len(pg.spec.policy.nicTeaming.nicOrder.activeNic)
+                        except:
+                            pass
+
+                        sink.write(
+                            host=host.name,
+                            name=pg.spec.name,
+                            vlan_id=pg.spec.vlanId,
+                            vswitch=pg.spec.vswitchName,
+                            num_ports=num_active_nics,
+                            security_allow_promiscuous=safe_get_property(
+                                pg, 'spec.policy.security.allowPromiscuous', None),
+                            security_mac_changes=safe_get_property(
+                                pg, 'spec.policy.security.macChanges', None),
+                            security_forged_transmits=safe_get_property(
+                                pg, 'spec.policy.security.forgedTransmits', None),
+                            host_moref=host.moid
+                        )
+                    except:
+                        continue
+            except Exception as e:
+                print(f"  ⚠ Error processing portgroups for host: {str(e)[:60]}")
+
+def export_distributed_portgroups(inventory):
+    """9. Export Distributed Port Groups"""
+    print("Mengekspor Distributed Port Groups...")
+    with open_table('vPortgroup_DV.csv') as sink:
+        for dvpg in inventory.records('portgroup_dv'):
+            try:
+                # Get VLAN info
+                vlan_id = vlan_type = None
+                try:
+                    vlan_config = dvpg.get('config.defaultPortConfig.vlan', None)
+                    if isinstance(vlan_config, vim.dvs.VmwareDistributedVirtualSwitch.VlanIdSpec):
+                        vlan_id = vlan_config.vlanId
+                        vlan_type = 'VLAN'
+                    elif isinstance(vlan_config,
+                                    vim.dvs.VmwareDistributedVirtualSwitch.TrunkVlanSpec):
+                        vlan_id = str([f"{r.start}-{r.end}" for r in vlan_config.vlanId])
+                        vlan_type = 'Trunk'
+                except:
+                    pass
+
+                dvs = dvpg.get('config.distributedVirtualSwitch', None)
+
+                sink.write(
+                    name=dvpg.name,
+                    dvswitch=inventory.name_of(dvs),
+                    type=dvpg.get('config.type'),
+                    num_ports=dvpg.get('config.numPorts'),
+                    vlan_id=vlan_id,
+                    vlan_type=vlan_type,
+                    port_binding=dvpg.get('config.defaultPortConfig.portBindingType'),
+                    auto_expand=dvpg.get('config.autoExpand'),
+                    moref=dvpg.moid,
+                    dvswitch_moref=moref_id(dvs)
+                )
+            except Exception as e:
+                print(f"  ⚠ Error on distributed portgroup: {str(e)[:60]}")
+
+def export_standard_vswitches(inventory):
+    """10. Export Standard vSwitches"""
+    print("Mengekspor Standard vSwitches...")
+    with open_table('vSwitch_Std.csv') as sink:
+        for host in inventory.records('vswitch_std'):
+            try:
+                for vsw in host.get('config.network.vswitch', []):
+                    try:
+                        sink.write(
+                            host=host.name,
+                            name=vsw.name,
+                            num_ports=vsw.spec.numPorts,
+                            num_ports_available=vsw.numPortsAvailable,
+                            mtu=vsw.mtu,
+                            num_physical_nics=len(vsw.pnic) if vsw.pnic else 0,
+                            physical_nics=','.join(vsw.pnic or ()),
+                            num_portgroups=len(vsw.portgroup) if vsw.portgroup else 0,
+                            host_moref=host.moid
+                        )
+                    except:
+                        continue
+            except Exception as e:
+                print(f"  ⚠ Error processing vswitches for host: {str(e)[:60]}")
+
+def export_vmkernel_nics(inventory):
+    """11. Export VMkernel NICs"""
+    print("Mengekspor VMkernel NICs...")
+    with open_table('vVMkernelNIC.csv') as sink:
+        for host in inventory.records('vmknic'):
+            try:
+                for vnic in host.get('config.network.vnic', []):
+                    try:
+                        dvport_id = None
+                        try:
+                            if (hasattr(vnic.spec, 'distributedVirtualPort')
+                                    and vnic.spec.distributedVirtualPort):
+                                dvport_id = vnic.spec.distributedVirtualPort.portKey
+                        except:
+                            pass
+
+                        sink.write(
+                            host=host.name,
+                            device=vnic.device,
+                            portgroup=vnic.portgroup,
+                            dvport_id=dvport_id,
+                            mac=safe_get_property(vnic, 'spec.mac', None),
+                            ip=safe_get_property(vnic, 'spec.ip.ipAddress', None),
+                            subnet_mask=safe_get_property(vnic, 'spec.ip.subnetMask', None),
+                            dhcp=safe_get_property(vnic, 'spec.ip.dhcp', None),
+                            mtu=safe_get_property(vnic, 'spec.mtu', None),
+                            host_moref=host.moid
+                        )
+                    except:
+                        continue
+            except Exception as e:
+                print(f"  ⚠ Error processing vmkernel NICs for host: {str(e)[:60]}")
+
+def export_physical_nics(inventory):
+    """12. Export Physical NICs"""
+    print("Mengekspor Physical NICs...")
+    with open_table('vPNIC.csv') as sink:
+        for host in inventory.records('pnic'):
+            try:
+                vswitches = host.get('config.network.vswitch', [])
+                for pnic in host.get('config.network.pnic', []):
+                    try:
+                        speed = duplex = vswitch_name = None
+                        if pnic.linkSpeed:
+                            speed = pnic.linkSpeed.speedMb
+                            duplex = pnic.linkSpeed.duplex
+
+                        for vsw in vswitches:
+                            if vsw.pnic and pnic.key in vsw.pnic:
+                                vswitch_name = vsw.name
+                                break
+
+                        sink.write(
+                            host=host.name,
+                            device=pnic.device,
+                            mac=pnic.mac,
+                            pci=pnic.pci,
+                            driver=pnic.driver,
+                            link_speed_mb=speed,
+                            duplex=duplex,
+                            wol_supported=pnic.wakeOnLanSupported,
+                            vswitch=vswitch_name,
+                            host_moref=host.moid
+                        )
+                    except:
+                        continue
+            except Exception as e:
+                print(f"  ⚠ Error processing physical NICs for host: {str(e)[:60]}")
+
+def export_hbas(inventory):
+    """13. Export HBAs"""
+    print("Mengekspor HBAs...")
+    with open_table('vHBA.csv') as sink:
+        for host in inventory.records('hba'):
+            try:
+                for hba in host.get('config.storageDevice.hostBusAdapter', []):
+                    try:
+                        hba_type = wwn = speed = None
+
+                        if isinstance(hba, vim.host.FibreChannelHba):
+                            hba_type = 'Fibre Channel'
+                            # portWorldWideName berupa integer 64-bit
+                            wwn_hex = f"{hba.portWorldWideName:016x}"
+                            wwn = ':'.join([wwn_hex[i:i+2] for i in range(0, len(wwn_hex), 2)])
+                            speed = getattr(hba, 'speed', None)
+                        elif isinstance(hba, vim.host.InternetScsiHba):
+                            hba_type = 'iSCSI'
+                            wwn = getattr(hba, 'iScsiName', None)
+                        elif isinstance(hba, vim.host.ParallelScsiHba):
+                            hba_type = 'Parallel SCSI'
+
+                        sink.write(
+                            host=host.name,
+                            device=hba.device,
+                            type=hba_type,
+                            model=hba.model,
+                            driver=hba.driver,
+                            pci=hba.pci,
+                            status=hba.status,
+                            wwn_or_iqn=wwn,
+                            speed=speed,
+                            host_moref=host.moid
+                        )
+                    except:
+                        continue
+            except Exception as e:
+                print(f"  ⚠ Error processing HBAs for host: {str(e)[:60]}")
+
+def resolve_perf_counters(perf_manager, names):
+    """Indeks nama counter (group.name.rollup) -> PerfCounterInfo, satu fetch perfCounter"""
+    counters = {}
+    for info in perf_manager.perfCounter or []:
+        name = f"{info.groupInfo.key}.{info.nameInfo.key}.{info.rollupType}"
+        if name in names:
+            counters[name] = info
+    for name in names:
+        if name not in counters:
+            print(f"  ⚠ Counter {name} tidak tersedia di vCenter ini, dilewati")
+    return counters
+
+def perf_query_specs(records, metric_ids, interval_id):
+    """QuerySpec per entity untuk interval PERF_INTERVAL dan rentang PERF_WINDOW_MINUTES"""
+    options = {'metricId': metric_ids, 'intervalId': interval_id, 'format': 'normal'}
+    if PERF_INTERVAL == 'realtime':
+        # Realtime: sampel terbaru saja (tidak bergantung pada jam lokal)
+        options['maxSample'] = max(1, PERF_WINDOW_MINUTES * 60 // interval_id)
+    else:
+        options['startTime'] = datetime.now(timezone.utc) - timedelta(minutes=PERF_WINDOW_MINUTES)
+    return [vim.PerformanceManager.QuerySpec(entity=record.obj, **options) for record in records]
+
+def query_perf(inventory, specs):
+    """Satu panggilan QueryPerf dengan session yang dipinjam selama panggilan saja"""
+    with inventory.session() as content:
+        return with_retry("QueryPerf", content.perfManager.QueryPerf, specs)
+
+def export_performance(inventory):
+    """14. Export Performance Metrics (QueryPerf per batch entity)"""
+    print("Mengekspor Performance Metrics...")
+    interval_id = 20 if PERF_INTERVAL == 'realtime' else int(PERF_INTERVAL)
+    with open_table('vPerf.csv') as sink:
+        # Session hanya dipinjam per panggilan, tidak selama iterasi record
+        try:
+            with inventory.session() as content:
+                counters = resolve_perf_counters(content.perfManager, PERF_COUNTERS)
+        except Exception as e:
+            print(f"  ✗ Error: {e}")
+            return
+        if not counters:
+            return
+        by_key = {info.key: (name, info) for name, info in counters.items()}
+        metric_ids = [vim.PerformanceManager.MetricId(counterId=info.key, instance='')
+                      for info in counters.values()]
+        for entity_type, plan_name, active in (
+                ('host', 'perf_host', lambda r: r.get('runtime.connectionState') == 'connected'),
+                ('vm', 'perf_vm', lambda r: r.get('runtime.powerState') == 'poweredOn')):
+            for batch in inventory.batches(plan_name, PERF_BATCH_SIZE):
+                # Statistik hanya ada untuk host terhubung dan VM yang menyala
+                records = {record.moid: record for record in batch if active(record)}
+                if not records:
+                    continue
+                try:
+                    results = query_perf(inventory, perf_query_specs(records.values(), metric_ids,
+                                                                     interval_id))
+                except Exception as e:
+                    print(f"  ⚠ Error QueryPerf untuk {len(records)} {entity_type}: {str(e)[:60]}")
+                    continue
+                for entity_metric in results or []:
+                    record = records.get(entity_metric.entity._moId)
+                    samples = entity_metric.sampleInfo or []
+                    if record is None or not samples:
+                        continue
+                    for series in entity_metric.value or []:
+                        try:
+                            name, info = by_key[series.id.counterId]
+                            # Nilai -1 berarti sampel kosong; persen dikirim dalam satuan 1/100
+                            scale = 100 if info.unitInfo.key == 'percent' else 1
+                            values = [value / scale for value in series.value or [] if value >= 0]
+                            if not values:
+                                continue
+                            sink.write(
+                                entity_type=entity_type,
+                                name=record.name,
+                                counter=name,
+                                unit=info.unitInfo.key,
+                                instance=series.id.instance,
+                                interval=interval_id,
+                                samples=len(values),
+                                start_time=samples[0].timestamp,
+                                end_time=samples[-1].timestamp,
+                                average=sum(values) / len(values),
+                                minimum=min(values),
+                                maximum=max(values),
+                                latest=values[-1],
+                                moref=record.moid
+                            )
+                        except Exception as e:
+                            print(f"  ⚠ Error processing performance for {record.name}: "
+                                  f"{str(e)[:60]}")
+
+# Direktori state high-water mark vEvent.csv/vTask.csv (diisi dari --state-dir)
+HISTORY_STATE_DIR = STATE_DIR
+
+class HistoryMark:
+    """High-water mark satu tabel history: waktu entri terakhir + key entri pada waktu itu
+
+    Run berikutnya hanya meminta entri sejak waktu tersebut; entri dengan waktu yang
+    sama yang sudah diekspor dikenali dari key-nya.
+    """
+
+    def __init__(self, filename):
+        stem = os.path.splitext(filename)[0]
+        self.path = os.path.join(HISTORY_STATE_DIR, f'{stem}.history.json')
+        self.time = None
+        self.keys = set()
+        state = self._load()
+        if state:
+            self.time = datetime.fromisoformat(state['time'])
+            self.keys = set(state['keys'])
+        self._next_time = self.time
+        self._next_keys = set(self.keys)
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            print(f"  ⚠ High-water mark {self.path} tidak terbaca, dianggap run pertama: {e}")
+            return None
+
+    def begin_time(self):
+        """Awal rentang waktu filter collector"""
+        if self.time is None:
+            return datetime.now(timezone.utc) - timedelta(hours=HISTORY_INITIAL_HOURS)
+        return self.time
+
+    def is_new(self, when, key):
+        if self.time is None or when is None:
+            return True
+        return when > self.time or (when == self.time and key not in self.keys)
+
+    def advance(self, when, key):
+        """Catat entri yang sudah ditulis; mark baru disimpan lewat save()"""
+        if when is None:
+            return
+        if self._next_time is None or when > self._next_time:
+            self._next_time = when
+            self._next_keys = {key}
+        elif when == self._next_time:
+            self._next_keys.add(key)
+
+    def save(self):
+        if self._next_time is None or getattr(_table_capture, 'stream', None) is not None:
+            return  # ekspor via HTTP (mode serve) tidak menggeser mark
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'time': self._next_time.isoformat(), 'keys': sorted(self._next_keys)}, f)
+        os.replace(tmp_path, self.path)
+
+def history_roots(inventory):
+    """Entity filter collector: akar scope, atau None untuk seluruh vCenter"""
+    return inventory.scope.roots if inventory.scope is not None else [None]
+
+def iter_history(create_collector, read_next, specs, key):
+    """Entri history collector dari yang tertua, per halaman HISTORY_PAGE_SIZE
+
+    Satu collector per filter spec, dihapus setelah dibaca (jumlah collector per
+    session dibatasi vCenter). Putus koneksi diulang dengan collector baru dari awal
+    (RewindCollector); entri yang sudah dikirim, juga dari akar scope yang bertumpuk,
+    tidak diulang.
+    """
+    seen = set()
+    for spec in specs:
+        for attempt in range(1, RETRY_ATTEMPTS + 1):
+            collector = None
+            try:
+                collector = create_collector(filter=spec)
+                collector.RewindCollector()
+                while True:
+                    page = read_next(collector)
+                    if not page:
+                        break
+                    for entry in page:
+                        if key(entry) in seen:
+                            continue
+                        seen.add(key(entry))
+                        yield entry
+                break
+            except TRANSIENT_ERRORS as e:
+                if attempt == RETRY_ATTEMPTS:
+                    raise
+                backoff(attempt, e, "Baca history collector")
+            finally:
+                if collector is not None:
+                    try:
+                        collector.DestroyCollector()
+                    except Exception:
+                        pass
+
+def export_events(inventory):
+    """15. Export Events (EventHistoryCollector, hanya entri baru sejak run sebelumnya)"""
+    print("Mengekspor Events...")
+    mark = HistoryMark('vEvent.csv')
+    with inventory.session() as content, open_table('vEvent.csv') as sink:
+        if content.eventManager is None:
+            print("  ✗ Error: EventManager tidak tersedia")
+            return
+        specs = [vim.event.EventFilterSpec(
+            time=vim.event.EventFilterSpec.ByTime(beginTime=mark.begin_time()),
+            entity=(vim.event.EventFilterSpec.ByEntity(entity=root, recursion='all')
+                    if root else None))
+            for root in history_roots(inventory)]
+        events = iter_history(content.eventManager.CreateCollectorForEvents,
+                              lambda collector: collector.ReadNextEvents(
+                                  maxCount=HISTORY_PAGE_SIZE),
+                              specs, key=lambda event: event.key)
+        new_events = (event for event in events if mark.is_new(event.createdTime, event.key))
+        for event in checkpointed(new_events, lambda event: f'event-{event.key}'):
+            try:
+                sink.write(
+                    key=event.key,
+                    created_time=event.createdTime,
+                    event_type=(getattr(event, 'eventTypeId', None)
+                                or type(event).__name__.rsplit('.', 1)[-1]),
+                    user=event.userName or None,
+                    datacenter=event.datacenter and event.datacenter.name,
+                    cluster=event.computeResource and event.computeResource.name,
+                    host=event.host and event.host.name,
+                    vm=event.vm and event.vm.name,
+                    datastore=event.ds and event.ds.name,
+                    message=event.fullFormattedMessage,
+                    chain_id=event.chainId,
+                    host_moref=moref_id(event.host and event.host.host, None),
+                    vm_moref=moref_id(event.vm and event.vm.vm, None)
+                )
+                mark.advance(event.createdTime, event.key)
+            except Exception as e:
+                print(f"  ⚠ Error processing event: {str(e)[:60]}")
+    mark.save()
+
+def export_tasks(inventory):
+    """16. Export Tasks (TaskHistoryCollector, task selesai sejak run sebelumnya)"""
+    print("Mengekspor Tasks...")
+    mark = HistoryMark('vTask.csv')
+    with inventory.session() as content, open_table('vTask.csv') as sink:
+        if content.taskManager is None:
+            print("  ✗ Error: TaskManager tidak tersedia")
+            return
+        # Hanya task yang sudah selesai; task yang masih berjalan terambil di run berikutnya
+        specs = [vim.TaskFilterSpec(
+            time=vim.TaskFilterSpec.ByTime(timeType='completedTime', beginTime=mark.begin_time()),
+            state=['success', 'error'],
+            entity=vim.TaskFilterSpec.ByEntity(entity=root, recursion='all') if root else None)
+            for root in history_roots(inventory)]
+        tasks = iter_history(content.taskManager.CreateCollectorForTasks,
+                             lambda collector: collector.ReadNextTasks(maxCount=HISTORY_PAGE_SIZE),
+                             specs, key=lambda task: task.key)
+        new_tasks = (task for task in tasks if mark.is_new(task.completeTime, task.key))
+        for task in checkpointed(new_tasks, lambda task: task.key):
+            try:
+                duration = None
+                if task.startTime and task.completeTime:
+                    duration = (task.completeTime - task.startTime).total_seconds()
+                sink.write(
+                    key=task.key,
+                    name=task.descriptionId or task.name,
+                    entity_name=task.entityName,
+                    state=task.state,
+                    user=getattr(task.reason, 'userName', None) or None,
+                    queue_time=task.queueTime,
+                    start_time=task.startTime,
+                    complete_time=task.completeTime,
+                    duration_seconds=duration,
+                    error=task.error and (task.error.localizedMessage or task.error.msg
+                                          or type(task.error).__name__),
+                    event_chain_id=task.eventChainId,
+                    entity_moref=moref_id(task.entity, None)
+                )
+                mark.advance(task.completeTime, task.key)
+            except Exception as e:
+                print(f"  ⚠ Error processing task: {str(e)[:60]}")
+    mark.save()
+
+def custom_field_names(content):
+    """Indeks key custom field -> nama dari CustomFieldsManager.field (satu fetch per run)"""
+    manager = content.customFieldsManager
+    if manager is None:
+        print("  ⚠ CustomFieldsManager tidak tersedia, nama atribut tidak di-resolve")
+        return {}
+    fields = with_retry("CustomFieldsManager.field", lambda: manager.field)
+    return {field.key: field.name for field in fields or []}
+
+def export_custom_attributes(inventory):
+    """17. Export Custom Attributes (satu baris per VM dan atribut)"""
+    print("Mengekspor Custom Attributes...")
+    with open_table('vCustomAttr.csv') as sink:
+        # Session dilepas sebelum iterasi record (mode stream meminjam session sendiri)
+        try:
+            with inventory.session() as content:
+                names = custom_field_names(content)
+        except Exception as e:
+            print(f"  ⚠ Error membaca definisi custom field: {str(e)[:60]}")
+            names = {}
+        for vm in inventory.records('custom_attr'):
+            try:
+                if vm.get('config.template', False):
+                    continue
+                for custom_value in vm.get('customValue', []):
+                    sink.write(
+                        vm_name=vm.name,
+                        attribute=names.get(custom_value.key),
+                        value=getattr(custom_value, 'value', None),
+                        field_key=custom_value.key,
+                        vm_moref=vm.moid
+                    )
+            except Exception as e:
+                print(f"  ⚠ Error processing custom attributes for VM: {str(e)[:60]}")
+
+def guest_addresses(nic):
+    """(alamat, prefix, state) per IP NIC guest; tanpa ipConfig hanya daftar ipAddress"""
+    if nic.ipConfig and nic.ipConfig.ipAddress:
+        return [(ip.ipAddress, ip.prefixLength, ip.state) for ip in nic.ipConfig.ipAddress]
+    return [(address, None, None) for address in nic.ipAddress or []]
+
+def export_guest_networks(inventory):
+    """18. Export Guest Networks (satu baris per VM, NIC dan IP dari VMware Tools)"""
+    print("Mengekspor Guest Networks...")
+    with open_table('vGuestNet.csv') as sink:
+        for vm in inventory.records('guest_net'):
+            try:
+                if vm.get('config.template', False):
+                    continue
+                for nic in vm.get('guest.net', []):
+                    # NIC tanpa IP tetap ditulis satu baris (ip_address kosong)
+                    for address, prefix, state in guest_addresses(nic) or [(None, None, None)]:
+                        sink.write(
+                            vm_name=vm.name,
+                            nic_key=nic.deviceConfigId,
+                            network=nic.network,
+                            mac=nic.macAddress,
+                            connected=nic.connected,
+                            ip_address=address,
+                            ip_version=address and ('IPv6' if ':' in address else 'IPv4'),
+                            prefix_length=prefix,
+                            ip_state=state,
+                            vm_moref=vm.moid
+                        )
+            except Exception as e:
+                print(f"  ⚠ Error processing guest network for VM: {str(e)[:60]}")
+
+# Urutan exporter yang dijalankan main(): (key --only / nama plan, file, fungsi)
+EXPORTERS = [
+    ('info', 'vInfo.csv', export_vcenter_info),
+    ('cluster', 'vCluster.csv', export_clusters),
+    ('host', 'vHost.csv', export_hosts),
+    ('datastore', 'vDatastore.csv', export_datastores),
+    ('vm', 'vVM.csv', export_vms),
+    ('disk', 'vDisk.csv', export_disks),
+    ('snapshot', 'vSnapshot.csv', export_snapshots),
+    ('portgroup_std', 'vPortgroup_Std.csv', export_standard_portgroups),
+    ('portgroup_dv', 'vPortgroup_DV.csv', export_distributed_portgroups),
+    ('vswitch_std', 'vSwitch_Std.csv', export_standard_vswitches),
+    ('vmknic', 'vVMkernelNIC.csv', export_vmkernel_nics),
+    ('pnic', 'vPNIC.csv', export_physical_nics),
+    ('hba', 'vHBA.csv', export_hbas),
+    ('perf', 'vPerf.csv', export_performance),
+    ('event', 'vEvent.csv', export_events),
+    ('task', 'vTask.csv', export_tasks),
+    ('custom_attr', 'vCustomAttr.csv', export_custom_attributes),
+    ('guest_net', 'vGuestNet.csv', export_guest_networks),
+]
+
+def select_exporters(only=None):
+    """Exporter terpilih dari --only (key dipisah koma), semua exporter jika kosong"""
+    if not only:
+        return list(EXPORTERS)
+    keys = {key.strip() for key in only.split(',') if key.strip()}
+    known = [key for key, _, _ in EXPORTERS]
+    unknown = sorted(keys - set(known))
+    if unknown:
+        raise ValueError(f"tabel tidak dikenal: {', '.join(unknown)} (pilihan: {', '.join(known)})")
+    return [entry for entry in EXPORTERS if entry[0] in keys]
+
+def plans_for(exporters):
+    """Property plan yang dibutuhkan exporter terpilih saja"""
+    plans = {}
+    for key, _, _ in exporters:
+        for plan_name in PLAN_GROUPS.get(key, (key,)):
+            if plan_name in PROPERTY_PLANS:
+                plans[plan_name] = PROPERTY_PLANS[plan_name]
+    return plans
+
+def run_exporter(exporter, inventory):
+    """Jalankan satu exporter; waktu, panggilan API dan baris dicatat atas namanya"""
+    with METRICS.scope(exporter.__name__):
+        exporter(inventory)
+
+def run_exporters(inventory, workers=1, exporters=None):
+    """Jalankan exporter (default semua), paralel di thread pool jika workers > 1"""
+    exporters = EXPORTERS if exporters is None else exporters
+    if workers <= 1:
+        for _, _, exporter in exporters:
+            run_exporter(exporter, inventory)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_exporter, exporter, inventory)
+                   for _, _, exporter in exporters]
+        for future in futures:
+            future.result()
+
+# ============================================
+# ROLLUP KAPASITAS
+# ============================================
+
+# Tabel sumber rollup (--rollup) dan tabel yang dihasilkan setelah semua exporter selesai
+ROLLUP_SOURCES = ('vCluster.csv', 'vHost.csv', 'vDatastore.csv', 'vVM.csv', 'vDisk.csv')
+ROLLUP_TABLES = ('vRollup_Cluster.csv', 'vRollup_Datastore.csv')
+# Baris vRollup_Cluster.csv untuk semua host di luar cluster (cluster_moref 'N/A' di vHost)
+ROLLUP_STANDALONE = '(standalone)'
+
+def _ratio(numerator, denominator):
+    """Rasio; None (ditulis 'N/A') bila penyebut nol, bukan 0 yang terbaca 'tanpa overcommit'"""
+    return numerator / denominator if denominator else None
+
+class RollupSink:
+    """Meneruskan baris satu tabel sumber ke CapacityRollup"""
+
+    def __init__(self, rollup, filename):
+        self.rollup = rollup
+        self.filename = filename
+
+    def write(self, row):
+        self.rollup.add(self.filename, row)
+
+    def close(self):
+        pass
+
+    def abort(self):
+        with self.rollup.lock:
+            self.rollup.incomplete.add(self.filename)
+
+class CapacityRollup:
+    """Rollup kapasitas cluster/datastore dari baris tabel yang diekspor run ini
+
+    Baris sumber tidak disimpan: setiap baris langsung diringkas per host, VM dan
+    datastore (group-by bertahap, memori sebanding jumlah grup), lalu digabung lewat
+    kolom moref di write_tables(). Tidak ada panggilan vCenter tambahan.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clusters = {}                      # cluster moref -> nama
+        self.hosts = {}                         # host moref -> baris vHost
+        self.datastores = {}                    # datastore moref -> baris vDatastore
+        self.host_vms = defaultdict(Counter)    # host moref -> total VM di host
+        self.vm_hosts = {}                      # VM moref -> host moref
+        self.vm_disks = Counter()               # VM moref -> kapasitas disk (GB)
+        self.datastore_disks = defaultdict(Counter)
+        self.incomplete = set()
+
+    def sink(self, filename):
+        """Sink untuk EXTRA_SINKS; None untuk tabel yang bukan sumber rollup"""
+        return RollupSink(self, filename) if filename in ROLLUP_SOURCES else None
+
+    def add(self, filename, row):
+        with self.lock:
+            if filename == 'vCluster.csv':
+                self.clusters[row.moref] = row.name
+            elif filename == 'vHost.csv':
+                self.hosts[row.moref] = row
+            elif filename == 'vDatastore.csv':
+                self.datastores[row.moref] = row
+            elif filename == 'vVM.csv':
+                totals = self.host_vms[row.host_moref]
+                totals['vms'] += 1
+                totals['vcpu'] += row.num_cpu
+                totals['vram_gb'] += row.memory_gb
+                if row.power_state == 'poweredOn':
+                    totals['vms_powered_on'] += 1
+                    totals['vcpu_powered_on'] += row.num_cpu
+                    totals['vram_powered_on_gb'] += row.memory_gb
+                self.vm_hosts[row.moref] = row.host_moref
+            elif filename == 'vDisk.csv':
+                self.vm_disks[row.vm_moref] += row.capacity_gb
+                disks = self.datastore_disks[row.datastore_moref]
+                disks['disks'] += 1
+                disks['thin'] += row.thin_provisioned
+                disks['capacity_gb'] += row.capacity_gb
+
+    def write_tables(self):
+        """Tulis vRollup_Cluster.csv dan vRollup_Datastore.csv"""
+        print("Menghitung rollup kapasitas...")
+        if self.incomplete:
+            print(f"  ⚠ Rollup dilewati, tabel sumber tidak lengkap: "
+                  f"{', '.join(sorted(self.incomplete))}")
+            return
+        self._write_clusters()
+        self._write_datastores()
+
+    def _write_clusters(self):
+        clusters = defaultdict(Counter)
+        max_vms = Counter()
+        for moref, host in self.hosts.items():
+            vms = self.host_vms.get(moref, Counter())
+            totals = clusters[host.cluster_moref]
+            totals['hosts'] += 1
+            totals['pcpu_cores'] += host.cpu_cores
+            totals['pram_gb'] += host.memory_gb
+            totals.update(vms)
+            max_vms[host.cluster_moref] = max(max_vms[host.cluster_moref], vms['vms'])
+        for vm_moref, capacity in self.vm_disks.items():
+            host = self.hosts.get(self.vm_hosts.get(vm_moref))
+            if host is not None:
+                clusters[host.cluster_moref]['disk_gb'] += capacity
+        # Host di luar cluster digabung menjadi satu baris agar kapasitasnya tidak hilang
+        entries = list(self.clusters.items())
+        standalone = KIND_DEFAULTS[str]
+        if clusters.get(standalone):
+            entries.append((standalone, ROLLUP_STANDALONE))
+        with open_table('vRollup_Cluster.csv') as sink:
+            for moref, name in entries:
+                totals = clusters.get(moref, Counter())
+                sink.write(
+                    cluster=name,
+                    num_hosts=totals['hosts'],
+                    num_vms=totals['vms'],
+                    num_vms_powered_on=totals['vms_powered_on'],
+                    pcpu_cores=totals['pcpu_cores'],
+                    pram_gb=totals['pram_gb'],
+                    vcpu=totals['vcpu'],
+                    vcpu_powered_on=totals['vcpu_powered_on'],
+                    vram_gb=totals['vram_gb'],
+                    vram_powered_on_gb=totals['vram_powered_on_gb'],
+                    vcpu_per_pcpu=_ratio(totals['vcpu'], totals['pcpu_cores']),
+                    vram_per_pram=_ratio(totals['vram_gb'], totals['pram_gb']),
+                    vms_per_host=_ratio(totals['vms'], totals['hosts']),
+                    max_vms_per_host=max_vms[moref],
+                    disk_provisioned_gb=totals['disk_gb'],
+                    cluster_moref=moref
+                )
+
+    def _write_datastores(self):
+        with open_table('vRollup_Datastore.csv') as sink:
+            for moref, datastore in self.datastores.items():
+                disks = self.datastore_disks.get(moref, Counter())
+                # Provisioned = terpakai + dijanjikan ke disk thin (uncommitted)
+                provisioned = datastore.used_gb + datastore.uncommitted_gb
+                sink.write(
+                    datastore=datastore.name,
+                    type=datastore.type,
+                    capacity_gb=datastore.capacity_gb,
+                    free_gb=datastore.free_gb,
+                    used_gb=datastore.used_gb,
+                    uncommitted_gb=datastore.uncommitted_gb,
+                    provisioned_gb=provisioned,
+                    provisioned_percent=_ratio(provisioned * 100, datastore.capacity_gb),
+                    uncommitted_per_free=_ratio(datastore.uncommitted_gb, datastore.free_gb),
+                    num_vms=datastore.num_vms,
+                    num_disks=disks['disks'],
+                    num_thin_disks=disks['thin'],
+                    disk_capacity_gb=disks['capacity_gb'],
+                    datastore_moref=moref
+                )
+
+# Rollup run export yang sedang berjalan (diisi run_export bila --rollup)
+ROLLUP = None
+
+# ============================================
+# MODE SERVE (WaitForUpdatesEx + HTTP)
+# ============================================
+
+class InventoryWatcher:
+    """Menjaga InventorySnapshot tetap terkini lewat PropertyCollector WaitForUpdatesEx"""
+
+    def __init__(self, inventory):
+        self.inventory = inventory
+        content = inventory.content
+        # PropertyCollector khusus agar filter tidak bercampur dengan retrieval lain
+        self.collector = content.propertyCollector.CreatePropertyCollector()
+        self.version = ''
+        self._filter_types = {}
+        self._containers = []
+        self._stop = threading.Event()
+        self._thread = None
+        for vimtype, path_set in inventory.property_paths().items():
+            filter_spec, containers = build_filter_spec(content, vimtype, sorted(path_set),
+                                                        scope=inventory.scope)
+            self._containers.extend(containers)
+            if not filter_spec.objectSet:
+                continue
+            property_filter = self.collector.CreateFilter(filter_spec, partialUpdates=False)
+            self._filter_types[property_filter._moId] = vimtype
+
+    def sync(self, wait_seconds):
+        """Satu putaran WaitForUpdatesEx; hasil terpotong (truncated) langsung dilanjutkan"""
+        options = vmodl.query.PropertyCollector.WaitOptions(
+            maxWaitSeconds=wait_seconds,
+            maxObjectUpdates=self.inventory.page_size or DEFAULT_PAGE_SIZE
+        )
+        updated = 0
+        while True:
+            update_set = self.collector.WaitForUpdatesEx(self.version, options)
+            if update_set is None:
+                break
+            for filter_update in update_set.filterSet or []:
+                vimtype = self._filter_types.get(filter_update.filter._moId)
+                if vimtype is None:
+                    continue
+                for object_update in filter_update.objectSet or []:
+                    self.inventory.apply_update(vimtype, object_update)
+                    updated += 1
+            self.version = update_set.version
+            if not update_set.truncated:
+                break
+            options.maxWaitSeconds = 0
+        if updated:
+            self.inventory.taken_at = datetime.now()
+        return updated
+
+    def load(self):
+        """Muat inventori awal (hasil pertama WaitForUpdatesEx berisi semua objek)"""
+        print("Memuat inventori awal...")
+        self.sync(0)
+        for vimtype in self._filter_types.values():
+            print(f"  ✓ {vimtype.__name__} ({self.inventory.count(vimtype)} objek)")
+        print()
+
+    def _run(self):
+        with METRICS.scope('watch', timed=False):
+            self._watch()
+
+    def _watch(self):
+        while not self._stop.is_set():
+            try:
+                updated = self.sync(WATCH_WAIT_SECONDS)
+                if updated:
+                    print(f"  ↻ {updated} perubahan objek diterapkan (versi {self.version})")
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                print(f"  ⚠ WaitForUpdatesEx gagal, dicoba lagi: {e}")
+                self._stop.wait(10)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='inventory-watcher', daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Hentikan thread update dan hapus PropertyCollector beserta filternya"""
+        self._stop.set()
+        try:
+            self.collector.CancelWaitForUpdates()
+        except Exception:
+            pass
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        try:
+            self.collector.Destroy()
+            for container in self._containers:
+                container.Destroy()
+        except Exception as e:
+            print(f"  ⚠ Gagal membersihkan PropertyCollector: {e}")
+
+class TableRequestHandler(BaseHTTPRequestHandler):
+    """HTTP lokal: GET /<tabel>.csv merender tabel dari inventori di memori
+
+    GET / menampilkan daftar tabel, GET /dump menulis semua CSV ke disk,
+    GET /metrics menampilkan metrik run (Prometheus).
+    """
+
+    def do_GET(self):
+        inventory = self.server.inventory
+        exporters = self.server.exporters
+        tables = {filename: exporter for _, filename, exporter in exporters}
+        path = self.path.split('?', 1)[0].lstrip('/')
+        if path == '':
+            body = '\n'.join(tables) + '\n'
+            self._send(200, body, 'text/plain')
+        elif path == 'metrics':
+            self._send(200, METRICS.prometheus(), 'text/plain; version=0.0.4')
+        elif path == 'dump':
+            with inventory.lock:
+                run_exporters(inventory, exporters=exporters)
+            self._send(200, f"{len(tables)} tabel ditulis ke {os.getcwd()}\n", 'text/plain')
+        elif path in tables:
+            buffer = io.StringIO()
+            with inventory.lock, capture_tables(buffer):
+                run_exporter(tables[path], inventory)
+            self._send(200, buffer.getvalue(), 'text/csv')
+        else:
+            self._send(404, f"Tabel tidak dikenal: {path}\n", 'text/plain')
+
+    def _send(self, status, body, content_type):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        print(f"  [http] {self.address_string()} {format % args}")
+
+def run_daemon(args):
+    """Mode serve: login sekali, jaga inventori tetap terkini, layani tabel via HTTP"""
+    METRICS.reset()
+    with METRICS.scope('connect'):
+        si = connect_vcenter()
+        content = si.RetrieveContent()
+    exporters = select_exporters(args.only)
+    with METRICS.scope('collect'):
+        inventory = InventorySnapshot(content, plans=plans_for(exporters), page_size=args.page_size,
+                                      scope=resolve_scope(content, args))
+        watcher = InventoryWatcher(inventory)
+        watcher.load()
+    watcher.start()
+    server = ThreadingHTTPServer((args.http_host, args.http_port), TableRequestHandler)
+    server.inventory = inventory
+    server.exporters = exporters
+    print(f"✓ Melayani tabel di http://{args.http_host}:{args.http_port}/ (Ctrl+C untuk berhenti)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nMenghentikan mode serve...")
+    finally:
+        server.server_close()
+        watcher.close()
+        METRICS.write()
+
+# ============================================
+# MULTI-VCENTER
+# ============================================
+
+def load_targets(path):
+    """Baca daftar vCenter dari file JSON
+
+    Format: [{"host": "...", "user": "...", "password": "...", "port": 443,
+    "name": "opsional, isi kolom vcenter"}, ...]
+    """
+    with open(path, encoding='utf-8') as f:
+        targets = json.load(f)
+    for target in targets:
+        missing = [key for key in ('host', 'user', 'password') if key not in target]
+        if missing:
+            raise ValueError(f"Target {target.get('host', '?')} tidak lengkap: "
+                             f"{', '.join(missing)}")
+        target.setdefault('port', VCENTER_PORT)
+        target.setdefault('name', target['host'])
+    return targets
+
+def target_dir(output_dir, target):
+    """Subdirektori output untuk satu vCenter"""
+    return os.path.join(output_dir, 'vcenter_' + re.sub(r'[^A-Za-z0-9._-]', '_', target['name']))
+
+def export_target(target, args):
+    """Worker proses: ekspor satu vCenter ke subdirektorinya sendiri
+
+    Konfigurasi koneksi global di-set per proses, log ditulis ke export.log.
+    State run selalu terpisah per vCenter.
+    """
+    global VCENTER_HOST, VCENTER_USER, VCENTER_PASSWORD, VCENTER_PORT
+    VCENTER_HOST = target['host']
+    VCENTER_USER = target['user']
+    VCENTER_PASSWORD = target['password']
+    VCENTER_PORT = target['port']
+    directory = target_dir(args.output_dir, target)
+    os.makedirs(directory, exist_ok=True)
+    os.chdir(directory)
+    if os.path.isabs(args.state_dir):
+        # State (checkpoint, delta, high-water mark, cache) tidak boleh dipakai bersama
+        # antar vCenter; --state-dir relatif sudah berada di subdirektori target
+        args.state_dir = os.path.join(args.state_dir, os.path.basename(directory))
+    configure_run(args)
+    with open('export.log', 'w', encoding='utf-8') as log, redirect_stdout(log):
+        try:
+            run_export(args)
+        except Exception as e:
+            # Fault pyVmomi belum tentu bisa di-pickle ke proses induk
+            raise RuntimeError(f"{type(e).__name__}: {e}") from None
+    return directory
+
+def merge_tables(output_dir, results, exporters=None, extra_tables=()):
+    """Gabungkan tabel semua vCenter menjadi satu set CSV dengan kolom vcenter"""
+    print("\nMenggabungkan tabel...")
+    exporters = EXPORTERS if exporters is None else exporters
+    for filename in [filename for _, filename, _ in exporters] + list(extra_tables):
+        path = os.path.join(output_dir, filename)
+        fields = TABLE_SCHEMAS[filename].fields
+        with CsvSink(path, ('vcenter',) + fields) as sink:
+            for name, directory in results:
+                source = os.path.join(directory, filename)
+                if not os.path.exists(source):
+                    continue
+                with open(source, newline='', encoding='utf-8') as f:
+                    for row in csv.DictReader(f):
+                        sink.write([name] + [row.get(field, '') for field in fields])
+
+def run_multi_vcenter(args):
+    """Ekspor semua vCenter di file target, satu proses per vCenter"""
+    targets = load_targets(args.targets)
+    output_dir = os.path.abspath(args.output_dir)
+    args.output_dir = output_dir
+    if args.sqlite:
+        # Semua proses menulis ke satu database riwayat (dibedakan kolom vcenter)
+        args.sqlite = os.path.abspath(args.sqlite)
+    processes = args.processes or len(targets)
+    print(f"Mengekspor {len(targets)} vCenter dengan {processes} proses...\n")
+    results = []
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = {executor.submit(export_target, target, args): target for target in targets}
+        for future in as_completed(futures):
+            target = futures[future]
+            try:
+                directory = future.result()
+                results.append((target['name'], directory))
+                print(f"  ✓ {target['name']} -> {directory}")
+            except Exception as e:
+                # Kegagalan satu vCenter tidak menghentikan yang lain
+                print(f"  ✗ {target['name']}: {e}")
+    # Urutan baris mengikuti urutan target di file konfigurasi
+    order = [target['name'] for target in targets]
+    results.sort(key=lambda result: order.index(result[0]))
+    merge_tables(output_dir, results, select_exporters(args.only),
+                 ROLLUP_TABLES if args.rollup else ())
+    print(f"\n{len(results)}/{len(targets)} vCenter berhasil diekspor ke {output_dir}")
+    return results
+
+# ============================================
+# MODE RENDER (dari cache kolom)
+# ============================================
+
+# Operator filter --where, yang dua karakter dicoba lebih dulu
+WHERE_PATTERN = re.compile(r'^(\w+)\s*(>=|<=|!=|=|>|<)(.*)$')
+RENDER_FORMATS = {'csv': '.csv', 'jsonl': '.jsonl', 'parquet': '.parquet'}
+
+def parse_where(expressions):
+    """Filter --where KOLOM<op>NILAI; teks dibandingkan dengan pola glob untuk = dan !="""
+    filters = []
+    for expression in expressions or []:
+        match = WHERE_PATTERN.match(expression.strip())
+        if match is None:
+            raise ValueError(f"filter tidak valid: {expression} (contoh: power_state=poweredOn)")
+        filters.append(match.groups())
+    return filters
+
+def _number(text):
+    """Isi sel teks sebagai angka, None bila bukan angka (mis. 'N/A')"""
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+def _compare_number(cell, compare, value):
+    number = _number(cell)
+    return number is not None and compare(number, value)
+
+def build_predicate(table, filters):
+    """Predicate indeks baris untuk satu tabel, None bila tanpa filter
+
+    Mengembalikan False bila tabel tidak punya kolom yang difilter. Operator urutan
+    pada kolom teks (mis. kolom angka yang berisi 'N/A') membandingkan angka per sel;
+    sel yang bukan angka tidak cocok.
+    """
+    tests = []
+    for field, operator, text in filters:
+        if field not in table.kinds:
+            return False
+        column = table.column(field)
+        kind = table.kinds[field]
+        if kind == 'text' and operator in ('=', '!='):
+            expected = operator == '='
+            tests.append(lambda i, c=column, p=text, e=expected:
+                         fnmatch.fnmatchcase(c[i], p) == e)
+            continue
+        if kind == 'bool':
+            value = text.strip().lower() in ('true', '1', 'yes')
+        else:
+            value = _number(text)
+            if value is None:
+                raise ValueError(f"operator {operator} butuh nilai angka: {field}{operator}{text}")
+        compare = {
+            '=': lambda a, b: a == b, '!=': lambda a, b: a != b,
+            '>': lambda a, b: a > b, '<': lambda a, b: a < b,
+            '>=': lambda a, b: a >= b, '<=': lambda a, b: a <= b,
+        }[operator]
+        if kind == 'text':
+            tests.append(lambda i, c=column, v=value, f=compare: _compare_number(c[i], f, v))
+        else:
+            tests.append(lambda i, c=column, v=value, f=compare: f(c[i], v))
+    if not tests:
+        return None
+    return lambda index: all(test(index) for test in tests)
+
+def cached_tables(cache_dir, filenames):
+    """Path file cache tabel terpilih yang ada, berurutan seperti filenames"""
+    paths = []
+    for filename in filenames:
+        path = os.path.join(cache_dir, os.path.splitext(filename)[0] + CACHE_SUFFIX)
+        if os.path.exists(path):
+            paths.append(path)
+    return paths
+
+def write_parquet(path, table, fields, predicate):
+    """Tulis tabel ke Parquet (butuh pyarrow)"""
+    import pyarrow  # pylint: disable=import-outside-toplevel,import-error
+    import pyarrow.parquet  # pylint: disable=import-outside-toplevel,import-error
+    if predicate is None:
+        indexes = range(table.rows)
+    else:
+        indexes = [index for index in range(table.rows) if predicate(index)]
+    arrays = []
+    for field in fields:
+        column = table.column(field)
+        arrays.append(pyarrow.array([column[index] for index in indexes]))
+    pyarrow.parquet.write_table(pyarrow.Table.from_arrays(arrays, names=list(fields)), path)
+    return len(indexes)
+
+def render_table(table, output_dir, output_format, fields, predicate):
+    """Tulis satu tabel cache ke output_dir dalam format terpilih"""
+    stem = os.path.splitext(table.filename)[0]
+    path = os.path.join(output_dir, stem + RENDER_FORMATS[output_format])
+    if output_format == 'csv':
+        with CsvSink(path, fields) as sink:
+            for row in table.iter_rows(fields, predicate):
+                sink.write(row)
+        return
+    if output_format == 'jsonl':
+        count = 0
+        with open(path, 'w', encoding='utf-8') as f:
+            for row in table.iter_rows(fields, predicate):
+                f.write(json.dumps(dict(zip(fields, row)), ensure_ascii=False) + '\n')
+                count += 1
+    else:
+        count = write_parquet(path, table, fields, predicate)
+    print(f"  ✓ {path} ({count} records)")
+
+def run_render(args):
+    """Mode render: tulis ulang tabel dari cache kolom run terakhir, tanpa koneksi vCenter"""
+    cache_dir = os.path.join(args.state_dir, CACHE_DIR)
+    filenames = [filename for _, filename, _ in select_exporters(args.only)]
+    if not args.only:
+        filenames.extend(ROLLUP_TABLES)
+    paths = cached_tables(cache_dir, filenames)
+    if not paths:
+        print(f"✗ Tidak ada cache di {cache_dir}; jalankan ekspor dengan --cache terlebih dulu")
+        return
+    if args.format == 'parquet' and importlib.util.find_spec('pyarrow') is None:
+        print("✗ Format parquet butuh paket pyarrow (pip install pyarrow)")
+        return
+    filters = parse_where(args.where)
+    columns = [field.strip() for field in (args.columns or '').split(',') if field.strip()]
+    os.makedirs(args.output_dir, exist_ok=True)
+    print(f"Merender {len(paths)} tabel dari {cache_dir} ({args.format})...\n")
+    for path in paths:
+        with CachedTable(path) as table:
+            print(f"  ℹ {table.filename}: vCenter {table.vcenter}, diekspor {table.created}")
+            try:
+                predicate = build_predicate(table, filters)
+            except ValueError as e:
+                print(f"  ✗ {table.filename} dilewati: {e}")
+                continue
+            if predicate is False:
+                print(f"  ℹ {table.filename} dilewati (tidak punya kolom filter)")
+                continue
+            fields = tuple(field for field in columns if field in table.kinds) or table.fields
+            render_table(table, args.output_dir, args.format, fields, predicate)
+
+# ============================================
+# MAIN FUNCTION
+# ============================================
+
+def parse_args(argv=None):
+    """Argumen command line"""
+    parser = argparse.ArgumentParser(description="vCenter Data Exporter ke CSV")
+    parser.add_argument(
+        'command', nargs='?', choices=['export', 'serve', 'render'], default='export',
+        help="export: sekali jalan ke CSV (default); serve: daemon yang menjaga "
+             "inventori tetap terkini dan melayani tabel via HTTP; render: tulis ulang "
+             "tabel dari cache kolom (--cache) tanpa koneksi vCenter"
+    )
+    parser.add_argument(
+        '--workers', type=int, default=1,
+        help="jumlah thread paralel; session vCenter yang dibuka maksimal "
+             f"{MAX_POOL_SESSIONS} (default: 1, sekuensial)"
+    )
+    parser.add_argument(
+        '--page-size', type=int, default=DEFAULT_PAGE_SIZE,
+        help=f"jumlah objek per halaman RetrievePropertiesEx (default: {DEFAULT_PAGE_SIZE})"
+    )
+    parser.add_argument(
+        '--stream', action='store_true',
+        help="jangan simpan VM di memori; VM diambil per halaman saat diekspor"
+    )
+    parser.add_argument(
+        '--delta', action='store_true',
+        help="tulis juga file *_added/_changed/_removed.csv dibanding run sebelumnya"
+    )
+    parser.add_argument(
+        '--cache', action='store_true',
+        help=f"simpan juga setiap tabel sebagai file kolom di <state-dir>/{CACHE_DIR}/ "
+             "untuk perintah render"
+    )
+    parser.add_argument(
+        '--sqlite', metavar='FILE',
+        help="simpan juga setiap tabel ke database SQLite FILE; setiap run disimpan "
+             "berdampingan (kolom run_ts) untuk query riwayat"
+    )
+    parser.add_argument(
+        '--rollup', action='store_true',
+        help="setelah ekspor, hitung vRollup_Cluster.csv (overcommit vCPU/vRAM, kepadatan VM "
+             "per host) dan vRollup_Datastore.csv (overprovisioning) dari tabel yang diekspor"
+    )
+    parser.add_argument(
+        '--resume', action='store_true',
+        help="lanjutkan run sebelumnya yang gagal: tabel yang sudah selesai dilewati, "
+             "tabel setengah jadi dilanjutkan dari batch terakhir"
+    )
+    parser.add_argument(
+        '--state-dir', default=STATE_DIR,
+        help=f"direktori state antar run (default: {STATE_DIR})"
+    )
+    parser.add_argument(
+        '--http-host', default=HTTP_HOST,
+        help=f"alamat HTTP mode serve (default: {HTTP_HOST})"
+    )
+    parser.add_argument(
+        '--http-port', type=int, default=HTTP_PORT,
+        help=f"port HTTP mode serve (default: {HTTP_PORT})"
+    )
+    parser.add_argument(
+        '--only', metavar='TABEL',
+        help="hanya ekspor tabel tertentu, dipisah koma (mis. vm,disk,pnic); pilihan: "
+             + ', '.join(key for key, _, _ in EXPORTERS)
+    )
+    parser.add_argument(
+        '--datacenter', action='append', metavar='GLOB',
+        help="batasi ekspor ke datacenter yang namanya cocok (boleh diulang)"
+    )
+    parser.add_argument(
+        '--cluster', action='append', metavar='GLOB',
+        help="batasi ekspor ke cluster yang namanya cocok (boleh diulang); dengan "
+             "--workers setiap cluster diambil paralel"
+    )
+    parser.add_argument(
+        '--folder', action='append', metavar='GLOB',
+        help="batasi ekspor ke folder yang namanya cocok (boleh diulang)"
+    )
+    parser.add_argument(
+        '--session-cache', action='store_true',
+        help=f"simpan session vCenter di {SESSION_CACHE_DIR} dan pakai ulang pada run "
+             "berikutnya selama belum kedaluwarsa"
+    )
+    parser.add_argument(
+        '--keepalive', type=int, default=0, metavar='SECONDS',
+        help="kirim CurrentTime setiap SECONDS detik agar session tidak idle timeout"
+    )
+    parser.add_argument(
+        '--max-inflight', type=int, default=MAX_INFLIGHT, metavar='N',
+        help="batas atas panggilan API bersamaan; batas aktual diturunkan otomatis "
+             f"saat vCenter melambat (default: {MAX_INFLIGHT})"
+    )
+    parser.add_argument(
+        '--min-inflight', type=int, default=MIN_INFLIGHT, metavar='N',
+        help=f"batas bawah panggilan API bersamaan (default: {MIN_INFLIGHT})"
+    )
+    parser.add_argument(
+        '--latency-target', type=float, default=LATENCY_TARGET, metavar='SECONDS',
+        help="latency panggilan API di atas nilai ini dianggap tanda vCenter terbebani "
+             f"(default: {LATENCY_TARGET})"
+    )
+    parser.add_argument(
+        '--max-rps', type=float, default=MAX_RPS, metavar='N',
+        help="batas request API per detik untuk seluruh proses (default: 0, tanpa batas)"
+    )
+    parser.add_argument(
+        '--perf-interval', default=PERF_INTERVAL,
+        choices=['realtime', '300', '1800', '7200', '86400'],
+        help="interval statistik vPerf.csv: realtime (20 detik) atau rollup historis "
+             f"dalam detik (default: {PERF_INTERVAL})"
+    )
+    parser.add_argument(
+        '--perf-window', type=int, default=PERF_WINDOW_MINUTES, metavar='MINUTES',
+        help=f"rentang statistik vPerf.csv ke belakang (default: {PERF_WINDOW_MINUTES} menit)"
+    )
+    parser.add_argument(
+        '--perf-batch', type=int, default=PERF_BATCH_SIZE, metavar='N',
+        help=f"jumlah host/VM per panggilan QueryPerf (default: {PERF_BATCH_SIZE})"
+    )
+    parser.add_argument(
+        '--history-hours', type=int, default=HISTORY_INITIAL_HOURS, metavar='HOURS',
+        help="rentang vEvent.csv/vTask.csv pada run pertama; run berikutnya hanya "
+             f"mengambil entri baru sejak run sebelumnya (default: {HISTORY_INITIAL_HOURS})"
+    )
+    parser.add_argument(
+        '--targets', metavar='FILE',
+        help="file JSON berisi daftar vCenter; setiap vCenter diekspor di proses "
+             "sendiri lalu tabelnya digabung dengan kolom vcenter"
+    )
+    parser.add_argument(
+        '--processes', type=int, default=0,
+        help="jumlah proses untuk --targets (default: satu per vCenter)"
+    )
+    parser.add_argument(
+        '--output-dir', default='.',
+        help="direktori output --targets dan render (default: direktori saat ini)"
+    )
+    parser.add_argument(
+        '--format', default='csv', choices=sorted(RENDER_FORMATS),
+        help="format output render (default: csv; parquet butuh pyarrow)"
+    )
+    parser.add_argument(
+        '--where', action='append', metavar='KOLOM<op>NILAI',
+        help="render: hanya baris yang cocok, mis. power_state=poweredOn, "
+             "used_percent>=80, name=web-* (op: = != > < >= <=; boleh diulang)"
+    )
+    parser.add_argument(
+        '--columns', metavar='KOLOM',
+        help="render: hanya kolom tertentu, dipisah koma (mis. name,host,moref)"
+    )
+    args = parser.parse_args(argv)
+    try:
+        select_exporters(args.only)
+    except ValueError as e:
+        parser.error(f"--only: {e}")
+    if args.min_inflight < 1 or args.max_inflight < args.min_inflight:
+        parser.error("--min-inflight/--max-inflight: butuh 1 <= min <= max")
+    if args.max_rps < 0:
+        parser.error("--max-rps tidak boleh negatif")
+    if args.perf_window < 1 or args.perf_batch < 1:
+        parser.error("--perf-window dan --perf-batch minimal 1")
+    if args.rollup:
+        selected = {filename for _, filename, _ in select_exporters(args.only)}
+        missing = [key for key, filename, _ in EXPORTERS
+                   if filename in ROLLUP_SOURCES and filename not in selected]
+        if missing:
+            parser.error(f"--rollup butuh tabel {', '.join(missing)} (tambahkan ke --only)")
+    try:
+        parse_where(args.where)
+    except ValueError as e:
+        parser.error(f"--where: {e}")
+    return args
+
+def configure_run(args):
+    """Terapkan opsi command line ke konfigurasi modul (session, penjadwal, sink tambahan)"""
+    global SESSION_CACHE, KEEPALIVE_SECONDS, PERF_INTERVAL, PERF_WINDOW_MINUTES, PERF_BATCH_SIZE
+    global HISTORY_STATE_DIR, HISTORY_INITIAL_HOURS
+    SESSION_CACHE = args.session_cache
+    KEEPALIVE_SECONDS = args.keepalive
+    PERF_INTERVAL = args.perf_interval
+    PERF_WINDOW_MINUTES = args.perf_window
+    PERF_BATCH_SIZE = args.perf_batch
+    HISTORY_STATE_DIR = args.state_dir
+    HISTORY_INITIAL_HOURS = args.history_hours
+    SCHEDULER.configure(args.min_inflight, args.max_inflight, args.latency_target, args.max_rps)
+    EXTRA_SINKS.clear()
+    if args.delta:
+        EXTRA_SINKS.append(lambda filename: DeltaSink(filename, args.state_dir)
+                           if filename not in APPEND_ONLY_TABLES else None)
+    if args.cache:
+        EXTRA_SINKS.append(lambda filename: ColumnarSink(filename, args.state_dir))
+    if args.sqlite:
+        EXTRA_SINKS.append(lambda filename: SqliteSink(filename, args.sqlite))
+    if args.rollup:
+        EXTRA_SINKS.append(lambda filename: ROLLUP.sink(filename) if ROLLUP is not None else None)
+
+def resolve_scope(content, args):
+    """InventoryScope dari --datacenter/--cluster/--folder, None untuk seluruh inventori"""
+    scope = InventoryScope.resolve(content, args.datacenter, args.cluster, args.folder)
+    if scope is not None:
+        print(f"ℹ Scope: {scope.describe()}\n")
+    return scope
+
+def run_export(args):
+    """Satu kali ekspor: koneksi, ambil inventori, jalankan exporter terpilih
+
+    Metrik run selalu ditulis di akhir, juga bila ekspor gagal. Setiap tabel
+    dicatat di checkpoint sehingga run yang gagal bisa dilanjutkan dengan --resume.
+    Session ditutup eksplisit: worker ProcessPoolExecutor keluar tanpa menjalankan atexit.
+    """
+    global CHECKPOINT, ROLLUP
+    METRICS.reset()
+    CHECKPOINT = ExportCheckpoint(args.state_dir, resume=args.resume)
+    exporters = select_exporters(args.only)
+    pending = CHECKPOINT.pending(exporters)
+    if args.rollup:
+        # Rollup butuh semua baris tabel sumber: tabel sumber yang sudah selesai diekspor ulang
+        pending = [entry for entry in exporters if entry in pending or entry[1] in ROLLUP_SOURCES]
+        ROLLUP = CapacityRollup()
+    if len(pending) < len(exporters):
+        print(f"ℹ {len(exporters) - len(pending)} tabel sudah selesai di run sebelumnya, "
+              "dilewati\n")
+    exporters = pending
+    si = pool = None
+    try:
+        # Koneksi ke vCenter
+        if args.workers > 1:
+            with METRICS.scope('connect'):
+                pool = SessionPool(min(args.workers, MAX_POOL_SESSIONS))
+            with METRICS.scope('collect'):
+                inventory = InventorySnapshot(pool.content, plans=plans_for(exporters),
+                                              page_size=args.page_size,
+                                              stream=args.stream,
+                                              scope=resolve_scope(pool.content, args))
+                inventory.collect(pool, args.workers)
+        else:
+            with METRICS.scope('connect'):
+                si = connect_vcenter(register_exit=False)
+                content = si.RetrieveContent()
+            with METRICS.scope('collect'):
+                inventory = InventorySnapshot(content, plans=plans_for(exporters),
+                                              page_size=args.page_size, stream=args.stream,
+                                              scope=resolve_scope(content, args))
+                inventory.collect()
+
+        # Export semua data
+        print("Memulai ekspor data...\n")
+        run_exporters(inventory, args.workers, exporters)
+        if ROLLUP is not None:
+            with METRICS.scope('rollup'):
+                ROLLUP.write_tables()
+        CHECKPOINT.finish()
+        return inventory
+    finally:
+        if pool is not None:
+            pool.close()
+        if si is not None:
+            try:
+                disconnect_vcenter(si)
+            except Exception as e:
+                print(f"  ⚠ Gagal disconnect session: {e}")
+        CHECKPOINT = None
+        ROLLUP = None
+        METRICS.write()
+
+def main():
+    """Fungsi utama"""
+    args = parse_args()
+    configure_run(args)
+    print("="*60)
+    print("vCenter Data Exporter ke CSV")
+    print("="*60)
+    print(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+
+    if args.command == 'serve':
+        run_daemon(args)
+        return
+
+    if args.command == 'render':
+        run_render(args)
+        print("\nSelesai!")
+        return
+
+    if args.targets:
+        try:
+            run_multi_vcenter(args)
+        except Exception as e:
+            print(f"\n✗ ERROR: {e}")
+        print("\nSelesai!")
+        return
+
+    try:
+        run_export(args)
 
         print("\n" + "="*60)
         print("✓ SEMUA DATA BERHASIL DIEKSPOR!")
         print("="*60)
         print("\nFile yang dihasilkan:")
-        print("  1. vInfo.csv")
-        print("  2. vCluster.csv")
-        print("  3. vHost.csv")
-        print("  4. vDatastore.csv")
-        print("  5. vVM.csv")
-        print("  6. vDisk.csv")
-        print("  7. vSnapshot.csv")
-        print("  8. vPortgroup_Std.csv")
-        print("  9. vPortgroup_DV.csv")
-        print(" 10. vSwitch_Std.csv")
-        print(" 11. vVMkernelNIC.csv")
-        print(" 12. vPNIC.csv")
-        print(" 13. vHBA.csv")
+        filenames = [filename for _, filename, _ in select_exporters(args.only)]
+        if args.rollup:
+            filenames.extend(ROLLUP_TABLES)
+        for number, filename in enumerate(filenames, 1):
+            print(f"{number:>3}. {filename}")
 
     except Exception as e:
         print(f"\n✗ ERROR: {e}")
         import traceback
         traceback.print_exc()
+        print("\nℹ Tabel yang sudah selesai tersimpan di checkpoint; jalankan ulang dengan "
+              "--resume untuk melanjutkan")
 
     print("\nSelesai!")
 